@@ -1,10 +1,30 @@
-from typing import List, Optional, Dict, Tuple, Any, Union
-from collections import Counter, defaultdict
+from typing import List, Optional, Dict, Tuple, Any, Union, Callable, BinaryIO, IO
+from collections import Counter, defaultdict, deque
 from enum import Enum
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from statistics import NormalDist
+import asyncio
+import queue
+import re
+import shutil
+import signal
+import socket
 import subprocess
+import sys
+import tempfile
+import threading
 import time
 import datetime
+import gzip
+import hashlib
+import heapq
+import itertools
 import json
+import math
+import statistics
+import os
+import random
+import uuid
 
 class LineInfo:
     def __init__(self, lines_of_code: int, nr_annotations: int, loops: int):
@@ -18,11 +38,53 @@ class LineInfo:
     def __repr__(self) -> str:
         return f"LineInfo({self.lines_of_code}, {self.nr_annotations}, {self.loops})"
 
+# Resources used by a single run. Times are in seconds, memory in bytes; what could not be measured is None.
+class RunStats:
+    def __init__(self, wall: float, cpu_user: Optional[float] = None, cpu_sys: Optional[float] = None,
+            max_rss: Optional[int] = None, peak_rss: Optional[int] = None, phases: Optional[Dict[str, float]] = None,
+            load: Optional[float] = None, ctx_switches: Optional[int] = None, interference: Optional[float] = None):
+        # Wall-clock time from a monotonic clock
+        self.wall: float = wall
+        # CPU time of the command and all its (waited for) child processes
+        self.cpu_user: Optional[float] = cpu_user
+        self.cpu_sys: Optional[float] = cpu_sys
+        # Largest sampled resident set of any single process of the run, such as the JVM or Z3
+        self.max_rss: Optional[int] = max_rss
+        # Largest sampled resident memory of all processes of the run together
+        self.peak_rss: Optional[int] = peak_rss
+        # Seconds spent in each phase (startup, parse, transform, verify) that could be recognised
+        self.phases: Optional[Dict[str, float]] = phases
+        # Highest 1-minute load average of the machine during the run
+        self.load: Optional[float] = load
+        # Times the processes of the run were preempted (involuntary context switches)
+        self.ctx_switches: Optional[int] = ctx_switches
+        # CPU time that other processes used on the cores the run was pinned to, see `Isolation`
+        self.interference: Optional[float] = interference
+
+    @staticmethod
+    def from_dict(dct: Dict[str, Any]) -> "RunStats":
+        stats = RunStats(dct["wall"])
+        for k in stats.__dict__:
+            if k in dct:
+                setattr(stats, k, dct[k])
+        return stats
+
+    def cpu(self) -> Optional[float]:
+        if self.cpu_user == None or self.cpu_sys == None:
+            return None
+        return self.cpu_user + self.cpu_sys # type: ignore
+
+    def __repr__(self) -> str:
+        return f"RunStats({self.wall}, {self.cpu_user}, {self.cpu_sys}, {self.max_rss}, {self.peak_rss}, {self.phases}, " + \
+               f"{self.load}, {self.ctx_switches}, {self.interference})"
+
 class Result(str,Enum):
     Pass = 'pass'
     Fail = 'fail'
     Error = 'error'
     TimeOut = 'timeout'
+    # Killed for running out of memory, by the JVM, the solver or the operating system
+    OutOfMemory = 'memout'
 
 def is_annotation(line: str) -> bool:
     l = line.lstrip()
@@ -47,19 +109,27 @@ def is_none_line(line: str) -> bool:
 # Count the number of lines of code, annotations and loops
 # A line is either code or annotation, not both. So  lines of code + lines of annotations should be the complete number of lines.
 def count_lines(name: str) -> LineInfo:
-    lines_of_code: int = 0
-    nr_annotations: int = 0
-    loops: int = 0
     with open(name) as f:
-        for line in f:
-            if is_annotation(line):
+        return scan_lines(f.read())
+
+# `is_annotation` and `is_loop` in one: a line starts with at most one of these
+LINE_MATCHER = re.compile(r"\s*(?:(?P<annotation>(?:requires|ensures|context|context_everywhere|loop_invariant) )|(?P<loop>par |for |for\())")
+
+def scan_lines(text: str) -> LineInfo:
+    # The same counts as `count_lines`, for the contents of a file
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    nr_annotations = 0
+    loops = 0
+    for line in lines:
+        m = LINE_MATCHER.match(line)
+        if m != None:
+            if m.lastgroup == "annotation":
                 nr_annotations += 1
             else:
-                lines_of_code += 1
-            
-            if is_loop(line):
                 loops += 1
-    return LineInfo(lines_of_code, nr_annotations, loops)
+    return LineInfo(len(lines) - nr_annotations, nr_annotations, loops)
 
 def get_average(xs: List[Tuple[float, Result]]) -> Tuple[Optional[float], Optional[float], Optional[float], int, int, int]:
     total = 0.0
@@ -84,10 +154,78 @@ def get_average(xs: List[Tuple[float, Result]]) -> Tuple[Optional[float], Option
     avr_fails = failtime / fails if fails != 0 else None
     return avr_total, avr_pass, avr_fails, passes, fails,  timeouts
 
+# Some runs passed and others did not, marked with a dagger in the tables
+def is_inconsistent(xs: List[Tuple[float, Result]]) -> bool:
+    passes = sum(1 for (t,r) in xs if r == "pass")
+    return passes > 0 and passes < len(xs)
+
+def t_quantile(p: float, df: int) -> float:
+    # Quantile of Student's t-distribution, exact for df 1 and 2 and a Cornish-Fisher expansion otherwise
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2*p - 1) / math.sqrt(2*p*(1 - p))
+    z = NormalDist().inv_cdf(p)
+    g1 = (z**3 + z) / 4
+    g2 = (5*z**5 + 16*z**3 + 3*z) / 96
+    g3 = (3*z**7 + 19*z**5 + 17*z**3 - 15*z) / 384
+    g4 = (79*z**9 + 776*z**7 + 1482*z**5 - 1920*z**3 - 945*z) / 92160
+    return z + g1/df + g2/df**2 + g3/df**3 + g4/df**4
+
+def confidence_interval(times: List[float], confidence: float = 0.95) -> Tuple[float, float]:
+    # Mean and half width of the confidence interval of the mean
+    mean = statistics.fmean(times)
+    if len(times) < 2:
+        return mean, math.inf
+    sem = statistics.stdev(times) / math.sqrt(len(times))
+    return mean, t_quantile(1 - (1 - confidence) / 2, len(times) - 1) * sem
+
+def ranks(xs: List[float]) -> List[float]:
+    # Ranks starting at 1, ties get the average of their ranks
+    order = sorted(range(len(xs)), key=lambda i: xs[i])
+    r = [0.0] * len(xs)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and xs[order[j + 1]] == xs[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            r[order[k]] = (i + j) / 2 + 1
+        i = j + 1
+    return r
+
+def mann_whitney_u(xs: List[float], ys: List[float], max_exact: int = 20000) -> Tuple[float, float]:
+    # Two-sided Mann-Whitney U test of whether xs and ys come from the same distribution: the U statistic
+    # of xs and the p-value. When there are at most `max_exact` ways to split the pooled samples, the
+    # p-value is exact (enumerating all splits, which also handles ties); otherwise it uses the normal
+    # approximation with tie and continuity correction. Infinite values (timeouts) are ranked last.
+    n1, n2 = len(xs), len(ys)
+    if n1 == 0 or n2 == 0:
+        return 0.0, 1.0
+    r = ranks(xs + ys)
+    u = sum(r[:n1]) - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    if math.comb(n1 + n2, n1) <= max_exact:
+        observed = abs(u - mean)
+        extreme = 0
+        total = 0
+        for group in itertools.combinations(range(n1 + n2), n1):
+            total += 1
+            if abs(sum(r[i] for i in group) - n1 * (n1 + 1) / 2 - mean) >= observed - 1e-9:
+                extreme += 1
+        return u, extreme / total
+    n = n1 + n2
+    ties = sum(c**3 - c for c in Counter(r).values())
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))))
+    if sigma == 0:
+        return u, 1.0
+    z = (abs(u - mean) - 0.5) / sigma
+    return u, min(1.0, 2 * (1 - NormalDist().cdf(max(z, 0.0))))
+
 def average_to_str(xs: List[Tuple[float, Result]], name: str)-> str:
     t, passtime, failtime, passes, fails,  timeouts = get_average(xs)
     res: str
-    if((passes > 0 and passes < len(xs))):
+    if(is_inconsistent(xs)):
         print(f"inconsistent results for '{name}'")
         print(f"avr_total, passes, fails,  timeouts, passtime, failtime: {t, passes, fails,  timeouts, passtime, failtime}")
         res = str(round(t)) + "$^{\dag}$" # type: ignore
@@ -97,26 +235,159 @@ def average_to_str(xs: List[Tuple[float, Result]], name: str)-> str:
         res = "F"
     elif(timeouts > 0):
         res = "T.O."
+    elif(any(r == "memout" for (t,r) in xs)):
+        res = "M.O."
     return res
 
+def percentile(xs: List[float], q: float) -> float:
+    # The q-th percentile (0-100) of a non-empty list, interpolating linearly between the closest ranks
+    ys = sorted(xs)
+    pos = (len(ys) - 1) * q / 100
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(ys) - 1)
+    return ys[lo] + (ys[hi] - ys[lo]) * (pos - lo)
+
+def kaplan_meier_median(xs: List[Tuple[float, Result]]) -> Optional[float]:
+    # Median time to finish (pass or fail), where runs that did not finish (timeouts, errors, out of memory)
+    # are censored at their time: they only tell that finishing takes longer. None when at least half of
+    # the runs may not finish, e.g. when half of them timed out.
+    runs = sorted(xs, key=lambda x: x[0])
+    at_risk = len(runs)
+    survival = 1.0
+    for (t,r) in runs:
+        if r == "pass" or r == "fail":
+            survival *= (at_risk - 1) / at_risk
+            if survival <= 0.5:
+                return t
+        at_risk -= 1
+    return None
+
+class FileStatistics:
+    # Statistics of the repetitions of one file. The times are those of the runs that passed or failed;
+    # what cannot be computed from them (no such runs) is None.
+    def __init__(self, xs: List[Tuple[float, Result]], confidence: float = 0.95, resamples: int = 1000, seed: int = 0):
+        times = [t for (t,r) in xs if r == "pass" or r == "fail"]
+        self.n: int = len(xs)
+        self.finished: int = len(times)
+        self.mean: Optional[float] = statistics.fmean(times) if len(times) > 0 else None
+        self.median: Optional[float] = statistics.median(times) if len(times) > 0 else None
+        self.q1: Optional[float] = percentile(times, 25) if len(times) > 0 else None
+        self.q3: Optional[float] = percentile(times, 75) if len(times) > 0 else None
+        self.iqr: Optional[float] = self.q3 - self.q1 if len(times) > 0 else None # type: ignore
+        self.p90: Optional[float] = percentile(times, 90) if len(times) > 0 else None
+        # Percentile bootstrap confidence interval of the median, seeded so tables are reproducible
+        self.median_low: Optional[float] = None
+        self.median_high: Optional[float] = None
+        if len(times) > 0:
+            rng = random.Random(seed)
+            medians = [statistics.median(rng.choices(times, k=len(times))) for _ in range(resamples)]
+            self.median_low = percentile(medians, 100 * (1 - confidence) / 2)
+            self.median_high = percentile(medians, 100 * (1 + confidence) / 2)
+        self.censored_median: Optional[float] = kaplan_meier_median(xs)
+
+def compute_statistics(verification_times: Dict[str, List[Tuple[float, Result]]], confidence: float = 0.95,
+        resamples: int = 1000) -> Dict[str, FileStatistics]:
+    return {f: FileStatistics(xs, confidence, resamples) for f, xs in verification_times.items()}
+
+# Statistics the tables can show as time of a file. "mean" is the original average of `average_to_str`.
+STATISTICS: List[str] = ["mean", "median", "p90", "median_iqr", "median_ci", "censored"]
+
+def statistic_to_str(xs: List[Tuple[float, Result]], name: str, statistic: str = "mean", stats: Optional[FileStatistics] = None) -> str:
+    # The time of a file in a table, with the same marks as `average_to_str`: a dagger for inconsistent
+    # results, and F, T.O. or M.O. when no run passed. The "censored" statistic also gives a time when
+    # some runs timed out, as long as the Kaplan-Meier median exists.
+    if statistic == "mean":
+        return average_to_str(xs, name)
+    if statistic not in STATISTICS:
+        raise ValueError(f"Unknown statistic '{statistic}', expected one of {STATISTICS}")
+    s: FileStatistics = stats if stats != None else FileStatistics(xs) # type: ignore
+    inconsistent = is_inconsistent(xs)
+    value: Optional[str] = None
+    if statistic == "censored":
+        value = str(round(s.censored_median)) if s.censored_median != None else None # type: ignore
+    elif inconsistent or all(r == "pass" for (t,r) in xs):
+        if s.median != None:
+            if statistic == "median":
+                value = str(round(s.median)) # type: ignore
+            elif statistic == "p90":
+                value = str(round(s.p90)) # type: ignore
+            elif statistic == "median_iqr":
+                value = f"{round(s.median)} ({round(s.iqr)})" # type: ignore
+            elif statistic == "median_ci":
+                value = f"{round(s.median)} [{round(s.median_low)}, {round(s.median_high)}]" # type: ignore
+    if value != None:
+        return value + ("$^{\dag}$" if inconsistent else "")
+    if any(r == "fail" for (t,r) in xs):
+        return "F"
+    if any(r == "timeout" for (t,r) in xs):
+        return "T.O."
+    if any(r == "memout" for (t,r) in xs):
+        return "M.O."
+    return "-"
+
+# Extra columns the tables can show about the resources used by the runs of a file:
+# the average CPU time (user + sys) and the largest peak memory of the whole process tree
+RESOURCE_COLUMNS: Dict[str, str] = {'cpu': 'CPU (s)', 'mem': 'Mem. (MB)'}
+
+def resource_headers(columns: List[str], bold: bool = False) -> str:
+    return "".join(f"& \\textbf{{{RESOURCE_COLUMNS[c]}}} " if bold else f"& {RESOURCE_COLUMNS[c]} " for c in columns)
+
+def resources_to_str(stats: List[Optional[RunStats]], column: str) -> str:
+    known = [s for s in stats if s != None]
+    if column == 'cpu':
+        cpu = [s.cpu() for s in known if s.cpu() != None] # type: ignore
+        return str(round(statistics.fmean(cpu))) if len(cpu) > 0 else "-" # type: ignore
+    elif column == 'mem':
+        mem = [s.peak_rss if s.peak_rss != None else s.max_rss for s in known] # type: ignore
+        mem = [m for m in mem if m != None]
+        return str(round(max(mem) / 2**20)) if len(mem) > 0 else "-" # type: ignore
+    raise ValueError(f"Unknown resource column '{column}', expected one of {list(RESOURCE_COLUMNS)}")
 
 class Encoder(json.JSONEncoder):
     def default(self, o): # type: ignore
-        if(isinstance(o, LineInfo)):
+        if(isinstance(o, LineInfo) or isinstance(o, RunStats)):
             return o.__dict__
         return json.JSONEncoder.default(self, o)
 
 VerificationResults = Dict[str,List[Tuple[float,Result]]]
+RunStatsResults = Dict[str,List[Optional[RunStats]]]
+
+# Entries are stored as `[time, result]`, or as `[time, result, stats]` when the resources of the run were measured
+def is_run_stats(dct: Dict[str, Any]) -> bool:
+    return 'wall' in dct and 'cpu_user' in dct
 
-def as_ver_result(dct: Dict[str, Any]) -> VerificationResults:
+# Dictionaries nested in the run statistics, such as the phases, are not results
+def is_results(dct: Dict[str, Any]) -> bool:
+    return all(isinstance(v, list) for v in dct.values())
+
+def as_ver_result(dct: Dict[str, Any]) -> Union[VerificationResults, RunStats, Dict[str, Any]]:
+    if(is_run_stats(dct)):
+        return RunStats.from_dict(dct)
+    if(not is_results(dct)):
+        return dct
     result: Dict[str, List[Tuple[float, Result]]] = {}
     for k in dct:
         res_list: List[Tuple[float, Result]] = []
-        for time, res in dct[k]:
-            res_list.append((float(time), Result(res)))
+        for entry in dct[k]:
+            res_list.append((float(entry[0]), Result(entry[1])))
         result[k] = res_list
     return result
 
+def as_run_stats(dct: Dict[str, Any]) -> Union[RunStatsResults, RunStats, Dict[str, Any]]:
+    if(is_run_stats(dct)):
+        return RunStats.from_dict(dct)
+    if(not is_results(dct)):
+        return dct
+    return {k: [entry[2] if len(entry) > 2 else None for entry in dct[k]] for k in dct}
+
+def results_to_json(verification_times: VerificationResults, run_stats: RunStatsResults) -> str:
+    result: Dict[str, List[List[Any]]] = {}
+    for k in verification_times:
+        stats = run_stats.get(k, [])
+        result[k] = [[t, r] + ([stats[i]] if i < len(stats) and stats[i] != None else [])
+                     for i, (t, r) in enumerate(verification_times[k])]
+    return json.dumps(result, cls=Encoder)
+
 def as_line_info(dct: Dict[str, Any]) -> Union[Dict[str,Any], LineInfo]:
     if('lines_of_code' in dct):
         return LineInfo(**dct)
@@ -133,35 +404,315 @@ def read_results(prefix: str) -> Tuple[VerificationResults, Dict[str, LineInfo]]
         
     return results_verification, line_info
 
-def runCommand(command: List[str], log_file: Optional[str] = None, verbose: bool = False, timeout: Optional[int] = None)-> Tuple[float, Result]:
-    start = time.time()
-    out: Optional[str] = None
-    err_out: Optional[str] = None
-    try:
-        p = subprocess.run(command, capture_output=True, timeout=timeout, text=True)
-    except subprocess.TimeoutExpired as to:
-        end = time.time()
-        if(to.stdout):
-            out = to.stdout.decode("utf-8")
-        if(to.stderr):
-            err_out = to.stderr.decode("utf-8")
-        res = Result.TimeOut
-    else:
-        end = time.time()
-        out = p.stdout
-        err_out = p.stderr
-        if p.returncode == 0:
-            res = Result.Pass
-        elif p.returncode == 1:
-            res = Result.Fail
-        elif p.returncode == 2:
-            res = Result.Error
-        elif p.returncode == 3:
-            res = Result.TimeOut
+def read_run_stats(prefix: str) -> RunStatsResults:
+    with open(prefix + "_results_verification.json") as f:
+        return json.loads(f.read(), object_hook=as_run_stats)
+
+def result_prefixes(directory: str = "results") -> List[str]:
+    # The prefixes of all runs saved in `directory`, oldest first
+    prefixes = set()
+    for fn in os.listdir(directory):
+        for suffix in ("_results_verification.json", "_runs.jsonl"):
+            if fn.endswith(suffix):
+                prefixes.add(os.path.join(directory, fn[:-len(suffix)]))
+    return sorted(prefixes)
+
+def read_any_results(prefix: str) -> VerificationResults:
+    # The results of a run, from its append-only store if it has one and otherwise from its saved results
+    if os.path.exists(prefix + "_runs.jsonl"):
+        return ResultStore(prefix + "_runs.jsonl").results()[0]
+    with open(prefix + "_results_verification.json") as f:
+        return json.loads(f.read(), object_hook=as_ver_result)
+
+def load_history(directory: str = "results") -> Dict[str, VerificationResults]:
+    # The verification results of every run in `directory`, by prefix
+    return {prefix: read_any_results(prefix) for prefix in result_prefixes(directory)}
+
+def outcome(xs: List[Tuple[float, Result]]) -> str:
+    # The result of all repetitions of a file: the result they share, or "inconsistent"
+    kinds = {Result(r).value for (t,r) in xs}
+    if len(kinds) == 1:
+        return kinds.pop()
+    return "inconsistent" if len(kinds) > 1 else "missing"
+
+class FileComparison:
+    # How the results of a file changed between a base run and a new run. `speedup` is the median time of
+    # the base run over that of the new run (above 1 is faster), over the repetitions that passed or failed.
+    def __init__(self, file_name: str, base: List[Tuple[float, Result]], new: List[Tuple[float, Result]], alpha: float, min_change: float):
+        self.file_name: str = file_name
+        self.base_outcome: str = outcome(base)
+        self.new_outcome: str = outcome(new)
+        base_times = [t for (t,r) in base if r == "pass" or r == "fail"]
+        new_times = [t for (t,r) in new if r == "pass" or r == "fail"]
+        self.base_time: Optional[float] = statistics.median(base_times) if len(base_times) > 0 else None
+        self.new_time: Optional[float] = statistics.median(new_times) if len(new_times) > 0 else None
+        self.speedup: Optional[float] = None
+        if self.base_time != None and self.new_time != None and self.new_time > 0: # type: ignore
+            self.speedup = self.base_time / self.new_time # type: ignore
+        # Runs that did not finish count as slower than any that did
+        censored = lambda xs: [t if r == "pass" or r == "fail" else math.inf for (t,r) in xs]
+        _, self.p_value = mann_whitney_u(censored(base), censored(new))
+        self.significant: bool = self.p_value < alpha and self.speedup != None and abs(math.log(self.speedup)) >= math.log(1 + min_change) # type: ignore
+        self.status: str
+        if self.base_outcome == "missing" or self.new_outcome == "missing":
+            self.status = "only in " + ("new" if self.base_outcome == "missing" else "base")
+        elif self.base_outcome != self.new_outcome:
+            self.status = f"{self.base_outcome}->{self.new_outcome}"
+        elif self.significant:
+            self.status = "slower" if self.speedup < 1 else "faster" # type: ignore
         else:
-            res = Result.Fail
-            print("Got unexpected return code '" + str(p.returncode) + "' for command '" + " ".join(command) + "'")
+            self.status = "same"
+
+    def regression(self) -> bool:
+        # Slower, or a file that passed before and does not anymore
+        if self.base_outcome == "pass" and self.new_outcome not in ("pass", "missing"):
+            return True
+        return self.status == "slower"
 
+    def changed(self) -> bool:
+        return self.status != "same"
+
+def compare_results(base: VerificationResults, new: VerificationResults, alpha: float = 0.05,
+        min_change: float = 0.05) -> List[FileComparison]:
+    # Compares every file of two runs. A change in time is significant when the Mann-Whitney test gives
+    # p < `alpha` and the median time changed by at least `min_change` (relative). With a single repetition
+    # per run no change is significant, only changes in the outcome are found.
+    files = list(base) + [f for f in new if f not in base]
+    return [FileComparison(f, base.get(f, []), new.get(f, []), alpha, min_change) for f in files]
+
+def comparison_report(comparisons: List[FileComparison], base_name: str, new_name: str, fmt: str = "text",
+        show_all: bool = False) -> str:
+    # A table of the files that changed (or all files), as "text", "markdown" or "latex"
+    rows = [c for c in comparisons if show_all or c.changed()]
+    time_str = lambda t: f"{t:.1f}" if t != None else "-"
+    cells = [[c.file_name, time_str(c.base_time), time_str(c.new_time),
+              f"{c.speedup:.2f}x" if c.speedup != None else "-", f"{c.p_value:.3f}",
+              c.status + (" (!)" if c.regression() else "")] for c in rows]
+    header = ["File", "Base (s)", "New (s)", "Speedup", "p", "Status"]
+    regressions = sum(1 for c in comparisons if c.regression())
+    summary = f"{base_name} -> {new_name}: {len(comparisons)} files, {sum(1 for c in comparisons if c.changed())} changed, {regressions} regressions"
+    if fmt == "markdown":
+        lines = [f"**{summary}**", "", "| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+        lines += ["| " + " | ".join(row) + " |" for row in cells]
+    elif fmt == "latex":
+        escape = lambda x: x.replace("_", r"\_").replace("->", r"$\rightarrow$")
+        lines = [f"% {summary}", r"\begin{tabular}{l r r r r l}", r"\hline " + " & ".join(rf"\textbf{{{h}}}" for h in header) + r" \\ \hline \hline"]
+        lines += [" & ".join(escape(x) for x in row) + r" \\ \hline" for row in cells]
+        lines.append(r"\end{tabular}")
+    elif fmt == "text":
+        widths = [max(len(row[i]) for row in [header] + cells) for i in range(len(header))]
+        line = lambda row: "  ".join(x.ljust(w) if i == 0 or i == len(row) - 1 else x.rjust(w) for i, (x, w) in enumerate(zip(row, widths))).rstrip()
+        lines = [summary, line(header)] + [line(row) for row in cells]
+    else:
+        raise ValueError(f"Unknown report format '{fmt}', expected text, markdown or latex")
+    return "\n".join(lines)
+
+def compare_runs(prefixes: List[str], fmt: str = "text", alpha: float = 0.05, min_change: float = 0.05,
+        show_all: bool = False) -> bool:
+    # Compares every run with the first one (the baseline), prints the reports, and returns whether any
+    # run has regressions
+    base = read_any_results(prefixes[0])
+    regressed = False
+    for prefix in prefixes[1:]:
+        comparisons = compare_results(base, read_any_results(prefix), alpha, min_change)
+        print(comparison_report(comparisons, prefixes[0], prefix, fmt, show_all))
+        print()
+        regressed = regressed or any(c.regression() for c in comparisons)
+    return regressed
+
+# Concurrent runs of the same file append to the same log file
+_log_lock = threading.Lock()
+
+def result_from_returncode(returncode: int, command: List[str]) -> Result:
+    if returncode == 0:
+        return Result.Pass
+    elif returncode == 1:
+        return Result.Fail
+    elif returncode == 2:
+        return Result.Error
+    elif returncode == 3:
+        return Result.TimeOut
+    else:
+        print("Got unexpected return code '" + str(returncode) + "' for command '" + " ".join(command) + "'")
+        return Result.Fail
+
+# Output of a run that ran out of memory: the JVM heap, Z3's `memory_max_size` or a failed allocation
+OUT_OF_MEMORY = re.compile(r"java\.lang\.OutOfMemoryError|out of memory|Cannot allocate memory", re.IGNORECASE)
+
+def is_out_of_memory(returncode: int, out: Optional[str], err_out: Optional[str]) -> bool:
+    # A SIGKILL that the harness did not send is almost always the kernel's OOM killer
+    if returncode == -signal.SIGKILL:
+        return True
+    return returncode != 0 and any(OUT_OF_MEMORY.search(o) != None for o in (out, err_out) if o != None)
+
+def memory_available() -> Optional[int]:
+    # Bytes of memory that can be used without swapping, None when /proc/meminfo is not there
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+class MemoryGate:
+    # Admission control for concurrent runs. A job is only started when the memory it is expected to use fits
+    # in the budget next to the expected memory of the running jobs, and the system is not short of memory
+    # already (less than `reserve` bytes available, e.g. due to other processes). The budget is the memory
+    # available when the gate is made, minus `reserve`. A job is always admitted when nothing else runs,
+    # so a job that needs more than the machine has still runs, alone.
+    def __init__(self, reserve: int, budget: Optional[int] = None, poll: float = 0.5):
+        available = memory_available()
+        self.reserve: int = reserve
+        self.budget: Optional[int] = budget if budget != None else (available - reserve if available != None else None) # type: ignore
+        self.poll: float = poll
+        self.reserved: int = 0
+        self.running: int = 0
+        self.condition = threading.Condition()
+
+    def try_acquire(self, estimate: int) -> bool:
+        with self.condition:
+            if self.running > 0:
+                available = memory_available()
+                if self.budget != None and self.reserved + estimate > self.budget: # type: ignore
+                    return False
+                if available != None and available < self.reserve: # type: ignore
+                    return False
+            self.reserved += estimate
+            self.running += 1
+            return True
+
+    def acquire(self, estimate: int) -> None:
+        while not self.try_acquire(estimate):
+            with self.condition:
+                self.condition.wait(self.poll)
+
+    def release(self, estimate: int) -> None:
+        with self.condition:
+            self.reserved -= estimate
+            self.running -= 1
+            self.condition.notify_all()
+
+class LogConfig:
+    def __init__(self, compress: bool = False, max_bytes: Optional[int] = None, backups: int = 3, tail_lines: int = 200):
+        # Write logs as `<log_file>.gz`, gzip members can simply be appended to each other
+        self.compress: bool = compress
+        # When a log file grows beyond `max_bytes`, it is rotated to `<log>.1` before the next run is
+        # appended, keeping at most `backups` old files. The output of each stream of a single run is also
+        # capped at `max_bytes`, keeping its tail, see `OutputSpool`. None means unbounded.
+        self.max_bytes: Optional[int] = max_bytes
+        self.backups: int = backups
+        # Number of output lines per stream that are kept in memory for error reports and `verbose`
+        self.tail_lines: int = tail_lines
+
+log_config = LogConfig()
+
+def log_path(log_file: str) -> str:
+    return log_file + ".gz" if log_config.compress else log_file
+
+def rotate_log(path: str) -> None:
+    if log_config.max_bytes == None or not os.path.exists(path) or os.path.getsize(path) < log_config.max_bytes: # type: ignore
+        return
+    if log_config.backups <= 0:
+        os.remove(path)
+        return
+    for i in range(log_config.backups - 1, 0, -1):
+        if os.path.exists(f"{path}.{i}"):
+            os.replace(f"{path}.{i}", f"{path}.{i+1}")
+    os.replace(path, path + ".1")
+
+class OutputSpool:
+    # The output of one stream of a running command, written to `.part` files next to its log as it arrives,
+    # so a crashed harness still leaves the output behind. The files are gzip compressed when the logs are, so
+    # they are copied into the log as they are (gzip members can be appended to each other).
+    # With `log_config.max_bytes` the output is written in segments of half that size, and only the last two
+    # are kept, so a long and verbose run uses a bounded amount of disk and its tail ends up in the log.
+    def __init__(self, log_file: str, stream: str):
+        directory, base = os.path.split(log_file)
+        self.directory: str = directory or "."
+        self.prefix: str = base + "."
+        self.compressed: bool = log_config.compress
+        self.suffix: str = f".{stream}.part" + (".gz" if self.compressed else "")
+        self.segment_bytes: Optional[int] = log_config.max_bytes // 2 if log_config.max_bytes != None else None # type: ignore
+        # The kept segments, oldest first, with the number of bytes of output in each
+        self.segments: List[str] = []
+        self.sizes: List[int] = []
+        self.file: Optional[BinaryIO] = None
+        # Bytes of output written in total, and in the segments that were dropped
+        self.written: int = 0
+        self.dropped: int = 0
+        self.new_segment()
+
+    def new_segment(self) -> None:
+        if self.file != None:
+            self.file.close() # type: ignore
+        if self.segment_bytes != None and len(self.segments) == 2:
+            os.remove(self.segments.pop(0))
+            self.dropped += self.sizes.pop(0)
+        fd, path = tempfile.mkstemp(dir=self.directory, prefix=self.prefix, suffix=self.suffix)
+        os.close(fd)
+        self.file = gzip.open(path, "wb") if self.compressed else open(path, "wb") # type: ignore
+        self.segments.append(path)
+        self.sizes.append(0)
+
+    def write(self, data: bytes) -> None:
+        if self.segment_bytes != None and self.sizes[-1] > 0 and self.sizes[-1] + len(data) > self.segment_bytes:
+            self.new_segment()
+        self.file.write(data) # type: ignore
+        self.sizes[-1] += len(data)
+        self.written += len(data)
+
+    def copy_to(self, f: BinaryIO) -> None:
+        # Appends the kept output to the (raw) log file `f`, once the command is done
+        if self.file != None:
+            self.file.close() # type: ignore
+            self.file = None
+        for path in self.segments:
+            with open(path, "rb") as segment:
+                shutil.copyfileobj(segment, f)
+
+    def remove(self) -> None:
+        if self.file != None:
+            self.file.close() # type: ignore
+            self.file = None
+        for path in self.segments:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.segments = []
+
+# Appends one run to a log file. A section is either a string or the `OutputSpool` of the captured output.
+def write_log(log_file: str, command: List[str], res: Result, start: float, duration: float,
+        sections: List[Tuple[str, Union[Optional[str], OutputSpool]]]) -> None:
+    with _log_lock:
+        path = log_path(log_file)
+        rotate_log(path)
+        with open(path, "ab") as f:
+            def write(text: str) -> None:
+                data = text.encode("utf-8")
+                f.write(gzip.compress(data) if log_config.compress else data)
+            header = "="*80 + "\n"
+            header += " ".join(command) + "\n"
+            header += datetime.datetime.fromtimestamp(start).strftime('%Y-%m-%d %H:%M:%S')+ "\n"
+            header += f"Result: {res}, time: {duration} seconds \n"
+            write(header)
+            for title, content in sections:
+                if content == None or content == "":
+                    continue
+                if isinstance(content, str):
+                    write("="*36 + f" {title} " + "="*36 + "\n")
+                    write(content)
+                elif content.written > 0: # type: ignore
+                    write("="*36 + f" {title} " + "="*36 + "\n")
+                    if content.dropped > 0: # type: ignore
+                        write(f"[{content.dropped} bytes of earlier output dropped]\n") # type: ignore
+                    content.copy_to(f) # type: ignore
+
+# Prints and logs the outcome of a single run, the same for every way of running a command
+def report_run(command: List[str], res: Result, start: float, duration: float, out: Optional[str], err_out: Optional[str],
+        log_file: Optional[str] = None, verbose: bool = False) -> None:
     if(res == Result.Fail):
         print(f"Verification Error, see logfile '{log_file}' for details")
     
@@ -171,33 +722,1323 @@ def runCommand(command: List[str], log_file: Optional[str] = None, verbose: bool
         if(err_out):
             print(err_out)
     if(log_file):
-        with open(log_file, "a") as f:
-            f.write("="*80 + "\n")
-            f.write(" ".join(command) + "\n")
-            f.write(datetime.datetime.fromtimestamp(start).strftime('%Y-%m-%d %H:%M:%S')+ "\n")
-            f.write(f"Result: {res}, time: {end - start} seconds \n")
-            if(out):
-                f.write("="*36 +" Stdout " + "="*36 + "\n")
-                f.write
-                f.write(out)
-            if(err_out):
-                f.write("="*36 +" Stderr " + "="*36 + "\n")
-                f.write(err_out)
-
-    return end - start, res
+        write_log(log_file, command, res, start, duration, [("Stdout", out), ("Stderr", err_out)]) # type: ignore
+
+# Progress messages of VerCors and Silicon that mark the start of a phase, in the order the phases happen.
+# Everything before the first marker counts as `startup` (mostly the JVM). VerCors only prints its
+# progress messages when they are asked for, see `Experiments.progress`.
+PHASE_MARKERS: List[Tuple[str, str]] = [
+    ("parse", r"Pars(e|ing)"),
+    ("transform", r"Name [Rr]esolution|Transform|Rewrit|Translat|Resolv"),
+    ("verify", r"Verif(y|ying|ication)|Silicon|Carbon|Backend"),
+]
+
+class PhaseTracker:
+    # Splits a run into phases, based on the time at which the first line of each phase was printed.
+    # Phases only advance: a marker of an earlier phase after a later one has started is ignored.
+    def __init__(self, start: float, markers: Optional[List[Tuple[str, str]]] = None):
+        self.start: float = start
+        self.markers: List[Tuple[str, str]] = markers if markers != None else PHASE_MARKERS # type: ignore
+        self.matcher = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in self.markers))
+        self.order: List[str] = [name for name, _ in self.markers]
+        self.starts: List[Tuple[str, float]] = [("startup", 0.0)]
+        self.lock = threading.Lock()
+
+    def line(self, text: str, t: float) -> None:
+        m = self.matcher.search(text)
+        if m == None:
+            return
+        phase = m.lastgroup
+        with self.lock:
+            current = self.starts[-1][0]
+            if current == "startup" or self.order.index(phase) > self.order.index(current): # type: ignore
+                self.starts.append((phase, t - self.start)) # type: ignore
+
+    def phases(self, duration: float) -> Optional[Dict[str, float]]:
+        # Duration of each phase in seconds, the last phase lasts until the end of the run. None when no
+        # marker was printed (e.g. VerCors ran without `--progress`), as the run cannot be split then.
+        with self.lock:
+            if len(self.starts) == 1:
+                return None
+            ends = [t for _, t in self.starts[1:]] + [duration]
+            # The output readers can timestamp a last line just after the end of the run was measured
+            return {phase: max(0.0, end - t) for (phase, t), end in zip(self.starts, ends)}
+
+class OutputCapture:
+    # Reads one output stream of a process line by line as it is produced. Every line is written to `sink`
+    # (if any) and timestamped for `tracker`, only the last `tail_lines` lines stay in memory.
+    def __init__(self, stream: BinaryIO, sink: Optional[OutputSpool] = None, echo: bool = False, tracker: Optional[PhaseTracker] = None):
+        self.tail: "deque[str]" = deque(maxlen=log_config.tail_lines)
+        self.thread = threading.Thread(target=self.read, args=(stream, sink, echo, tracker), daemon=True)
+        self.thread.start()
+
+    def read(self, stream: BinaryIO, sink: Optional[OutputSpool], echo: bool, tracker: Optional[PhaseTracker]) -> None:
+        for line in iter(lambda: stream.readline(1 << 16), b""):
+            t = time.monotonic()
+            if sink != None:
+                sink.write(line) # type: ignore
+            text = line.decode("utf-8", errors="replace")
+            self.tail.append(text)
+            if tracker != None:
+                tracker.line(text, t) # type: ignore
+            if echo:
+                print(text, end="")
+        stream.close()
+
+    def text(self) -> Optional[str]:
+        self.thread.join()
+        return "".join(self.tail) if len(self.tail) > 0 else None
+
+def kill_process_group(p: subprocess.Popen) -> None: # type: ignore
+    # Also kills the JVM and solvers started by the process
+    try:
+        os.killpg(p.pid, signal.SIGKILL)
+    except OSError:
+        p.kill()
+
+class ProcessSampler:
+    # Periodically sums the resident memory of all processes in the session of `sid`. Commands are started
+    # in their own session, so this covers the command together with the JVM and solvers it starts.
+    # `max_rss` is the largest sample of a single process. Unlike `ru_maxrss` of the command, it does not
+    # include the memory of the harness that the command was forked from.
+    # Only available on systems with a Linux style /proc, elsewhere `peak_rss` and `max_rss` stay None.
+    def __init__(self, sid: int, interval: float = 0.2):
+        self.sid: int = sid
+        self.interval: float = interval
+        self.peak_rss: Optional[int] = None
+        self.max_rss: Optional[int] = None
+        self.max_load: Optional[float] = None
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        if os.path.isdir("/proc"):
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def sample(self) -> Tuple[int, int]:
+        # The resident memory of all processes of the session together, and of the largest one
+        total = 0
+        largest = 0
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+            except (OSError, IndexError):
+                continue
+            # Fields after the command name start at `state`, so session is the 4th and rss the 22nd
+            if int(fields[3]) == self.sid:
+                rss = int(fields[21]) * PAGE_SIZE
+                total += rss
+                largest = max(largest, rss)
+        return total, largest
+
+    def run(self) -> None:
+        while True:
+            rss, largest = self.sample()
+            if self.peak_rss == None or rss > self.peak_rss: # type: ignore
+                self.peak_rss = rss
+            if self.max_rss == None or largest > self.max_rss: # type: ignore
+                self.max_rss = largest
+            load = load_average()
+            if load != None and (self.max_load == None or load > self.max_load): # type: ignore
+                self.max_load = load
+            if self.stopped.wait(self.interval):
+                break
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.thread != None:
+            self.thread.join() # type: ignore
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+def load_average() -> Optional[float]:
+    try:
+        with open("/proc/loadavg") as f:
+            return float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+def cpu_busy(cpus: List[int]) -> Optional[float]:
+    # Seconds the given cores spent running anything (not idle or waiting for IO) since boot
+    busy = 0.0
+    try:
+        with open("/proc/stat") as f:
+            for line in f:
+                fields = line.split()
+                if not fields[0].startswith("cpu") or fields[0] == "cpu" or int(fields[0][3:]) not in cpus:
+                    continue
+                # user nice system idle iowait irq softirq steal
+                busy += sum(int(x) for x in fields[1:4] + fields[6:9])
+    except (OSError, ValueError, IndexError):
+        return None
+    return busy / CLOCK_TICKS
+
+class Isolation:
+    # Settings of benchmark-grade runs: each run gets `cores_per_job` cores of its own (see `CorePool`), and
+    # a run counts as disturbed when other processes used more than `max_interference` of the time of its
+    # cores, or the load average went above `max_load` (by default the number of cores). Disturbed runs are
+    # repeated up to `reruns` times; if the last one is still disturbed, it is kept with a warning.
+    def __init__(self, cores_per_job: int = 1, max_interference: float = 0.05, max_load: Optional[float] = None, reruns: int = 2):
+        self.cores_per_job: int = cores_per_job
+        self.max_interference: float = max_interference
+        self.max_load: float = max_load if max_load != None else float(os.cpu_count() or 1) # type: ignore
+        self.reruns: int = reruns
+
+    def noise(self, stats: RunStats, cpus: List[int]) -> List[str]:
+        # Why the run was disturbed, empty if it was not
+        reasons: List[str] = []
+        # CPU times are counted in clock ticks, so a few ticks of difference are measurement noise
+        limit = max(self.max_interference * stats.wall * len(cpus), 3 / CLOCK_TICKS)
+        if stats.interference != None and stats.wall > 0 and stats.interference > limit: # type: ignore
+            reasons.append(f"other processes used {stats.interference:.1f}s of CPU on its cores")
+        if stats.load != None and stats.load > self.max_load: # type: ignore
+            reasons.append(f"load average {stats.load:.1f}")
+        return reasons
+
+def pin_threads(cpus: List[int]) -> None:
+    # Lets all threads of this process only run on `cpus`; threads started later inherit it
+    try:
+        tasks = os.listdir("/proc/self/task")
+    except OSError:
+        tasks = ["0"]
+    for tid in tasks:
+        try:
+            os.sched_setaffinity(int(tid), cpus)
+        except OSError:
+            pass
+
+class CorePool:
+    # Hands out disjoint sets of cores, from the cores this process may run on. When there is a core to spare,
+    # the first one is kept for the harness itself (`harness`, see `pin_threads`), so the CPU time of its
+    # output readers, samplers and watchers does not count as interference of the runs.
+    def __init__(self, cores_per_job: int):
+        self.cores: List[int] = sorted(os.sched_getaffinity(0))
+        if cores_per_job > len(self.cores):
+            raise ValueError(f"Cannot pin jobs to {cores_per_job} cores, only {len(self.cores)} are available")
+        self.harness: Optional[int] = self.cores[0] if len(self.cores) > cores_per_job else None
+        cores = self.cores[1:] if self.harness != None else self.cores
+        self.free: "queue.Queue[List[int]]" = queue.Queue()
+        for i in range(0, len(cores) - cores_per_job + 1, cores_per_job):
+            self.free.put(cores[i:i + cores_per_job])
+        self.size: int = self.free.qsize()
+
+    def acquire(self) -> List[int]:
+        return self.free.get()
+
+    def release(self, cpus: List[int]) -> None:
+        self.free.put(cpus)
+
+def runCommandStats(command: List[str], log_file: Optional[str] = None, verbose: bool = False, timeout: Optional[int] = None,
+        cancel: Optional[threading.Event] = None, env: Optional[Dict[str, str]] = None, cpus: Optional[List[int]] = None)-> Tuple[float, Result, RunStats]:
+    # The output is streamed to spool files next to the log while the command runs (compressed and capped
+    # like the log, see `OutputSpool`), and appended to the log when it is done. Only the tail of the output
+    # is kept in memory. If the harness dies during a run, the `.part` files still hold its output.
+    # CPU time and the largest resident set come from the rusage of the command, which includes all
+    # descendants it waited for. The peak memory of the whole process tree is sampled while it runs.
+    # Output lines are timestamped as they arrive, to split the run into phases (see PHASE_MARKERS).
+    # Setting `cancel` kills the run, it is then reported as an Error and logged as cancelled.
+    # `env` holds extra environment variables for the command. With `cpus` the command (and everything it
+    # starts) only runs on these cores, and the CPU time other processes took on them is measured.
+    spools: List[Optional[OutputSpool]] = [None, None]
+    if(log_file):
+        spools = [OutputSpool(log_file, stream) for stream in ("stdout", "stderr")] # type: ignore
+    start_time = time.time()
+    start = time.monotonic()
+    busy_before = cpu_busy(cpus) if cpus != None else None
+    # When the harness shares the cores with the run, its own threads are not other processes
+    shared = cpus != None and len(set(cpus) & os.sched_getaffinity(0)) > 0 # type: ignore
+    own_before = os.times()
+    try:
+        # `taskset` sets the affinity and then executes the command, so the process is the command itself.
+        # Setting the affinity in a `preexec_fn` instead is not safe while other threads run jobs.
+        pinned = ["taskset", "-c", ",".join(map(str, cpus))] + command if cpus != None else command
+        p = subprocess.Popen(pinned, stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=True,
+                             env=dict(os.environ, **env) if env != None else None)
+        sampler = ProcessSampler(p.pid)
+        tracker = PhaseTracker(start)
+        out_capture = OutputCapture(p.stdout, spools[0], verbose, tracker) # type: ignore
+        err_capture = OutputCapture(p.stderr, spools[1], verbose, tracker) # type: ignore
+        finished = threading.Event()
+        timed_out = threading.Event()
+        cancelled = threading.Event()
+        def watch() -> None:
+            while not finished.wait(0.05):
+                if timeout != None and time.monotonic() - start >= timeout: # type: ignore
+                    timed_out.set()
+                elif cancel != None and cancel.is_set(): # type: ignore
+                    cancelled.set()
+                else:
+                    continue
+                kill_process_group(p)
+                return
+        watcher = threading.Thread(target=watch, daemon=True)
+        watcher.start()
+        _, status, usage = os.wait4(p.pid, 0)
+        end = time.monotonic()
+        busy_after = cpu_busy(cpus) if cpus != None else None
+        own_after = os.times()
+        finished.set()
+        watcher.join()
+        sampler.stop()
+        p.returncode = os.waitstatus_to_exitcode(status)
+        out = out_capture.text()
+        err_out = err_capture.text()
+        if timed_out.is_set():
+            res = Result.TimeOut
+        elif cancelled.is_set():
+            res = Result.Error
+        elif is_out_of_memory(p.returncode, out, err_out):
+            res = Result.OutOfMemory
+        else:
+            res = result_from_returncode(p.returncode, command)
+        interference = None
+        if busy_before != None and busy_after != None:
+            own = own_after.user + own_after.system - own_before.user - own_before.system if shared else 0.0
+            interference = max(0.0, busy_after - busy_before - usage.ru_utime - usage.ru_stime - own) # type: ignore
+        stats = RunStats(end - start, usage.ru_utime, usage.ru_stime, sampler.max_rss, sampler.peak_rss,
+                         tracker.phases(end - start), sampler.max_load, usage.ru_nivcsw, interference)
+
+        if(res == Result.Fail):
+            print(f"Verification Error, see logfile '{log_file}' for details")
+        if(log_file):
+            write_log(log_file, command, "cancelled" if cancelled.is_set() else res, start_time, end - start, # type: ignore
+                      [("Stdout", spools[0]), ("Stderr", spools[1])])
+    finally:
+        for spool in spools:
+            if spool != None:
+                spool.remove() # type: ignore
+    if(res == Result.Error and not cancelled.is_set() and not verbose and (err_out or out)):
+        print((err_out or out).rstrip()) # type: ignore
+    return end - start, res, stats
+
+async def runCommandAsync(command: List[str], log_file: Optional[str] = None, verbose: bool = False,
+        timeout: Optional[float] = None, env: Optional[Dict[str, str]] = None) -> Tuple[float, Result, RunStats]:
+    # The asyncio counterpart of `runCommandStats`, for running many commands from one event loop. The command
+    # is killed (with its process group) after `timeout` seconds, or when the task running it is cancelled;
+    # a cancelled run is logged as cancelled. The CPU time of a single child is not available here.
+    spools: List[Optional[OutputSpool]] = [None, None]
+    if(log_file):
+        spools = [OutputSpool(log_file, stream) for stream in ("stdout", "stderr")] # type: ignore
+    start_time = time.time()
+    start = time.monotonic()
+    tracker = PhaseTracker(start)
+
+    async def read(stream: asyncio.StreamReader, sink: Optional[OutputSpool]) -> Optional[str]:
+        tail: "deque[str]" = deque(maxlen=log_config.tail_lines)
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                # A line longer than the stream limit
+                line = await stream.read(1 << 16)
+            if line == b"":
+                break
+            if sink != None:
+                sink.write(line) # type: ignore
+            text = line.decode("utf-8", errors="replace")
+            tail.append(text)
+            tracker.line(text, time.monotonic())
+            if verbose:
+                print(text, end="")
+        return "".join(tail) if len(tail) > 0 else None
+
+    try:
+        p = await asyncio.create_subprocess_exec(*command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                                                 start_new_session=True, env=dict(os.environ, **env) if env != None else None)
+        sampler = ProcessSampler(p.pid)
+        readers = asyncio.gather(read(p.stdout, spools[0]), read(p.stderr, spools[1])) # type: ignore
+        res: Optional[Result] = None
+        try:
+            await asyncio.wait_for(p.wait(), timeout)
+        except asyncio.TimeoutError:
+            kill_process_group(p) # type: ignore
+            await p.wait()
+            res = Result.TimeOut
+        except asyncio.CancelledError:
+            kill_process_group(p) # type: ignore
+            await p.wait()
+            readers.cancel()
+            try:
+                await readers
+            except asyncio.CancelledError:
+                pass
+            sampler.stop()
+            if(log_file):
+                write_log(log_file, command, "cancelled", start_time, time.monotonic() - start, # type: ignore
+                          [("Stdout", spools[0]), ("Stderr", spools[1])])
+            raise
+        end = time.monotonic()
+        out, err_out = await readers
+        sampler.stop()
+        if res == None and is_out_of_memory(p.returncode, out, err_out): # type: ignore
+            res = Result.OutOfMemory
+        elif res == None:
+            res = result_from_returncode(p.returncode, command) # type: ignore
+        stats = RunStats(end - start, max_rss=sampler.max_rss, peak_rss=sampler.peak_rss, phases=tracker.phases(end - start), load=sampler.max_load)
+
+        if(res == Result.Fail):
+            print(f"Verification Error, see logfile '{log_file}' for details")
+        if(log_file):
+            write_log(log_file, command, res, start_time, end - start, [("Stdout", spools[0]), ("Stderr", spools[1])]) # type: ignore
+    finally:
+        for spool in spools:
+            if spool != None:
+                spool.remove() # type: ignore
+    if(res == Result.Error and not verbose and (err_out or out)):
+        print((err_out or out).rstrip()) # type: ignore
+    return end - start, res, stats # type: ignore
+
+def runCommand(command: List[str], log_file: Optional[str] = None, verbose: bool = False, timeout: Optional[int] = None)-> Tuple[float, Result]:
+    t, res, _ = runCommandStats(command, log_file, verbose, timeout)
+    return t, res
+
+# Signature shared by `runCommandStats` and the alternative execution backends below
+Runner = Callable[[List[str], Optional[str], bool, Optional[int]], Tuple[float, Result, RunStats]]
+
+# Extra seconds a daemon gets on top of the job timeout to report back, before it is considered hung
+DAEMON_GRACE = 10
+
+class VerifierDaemon:
+    # A long-lived verifier process that handles one job at a time. Jobs are sent over its stdin and answered
+    # over its stdout, one JSON object per line:
+    #   request:  {"args": [...], "timeout": <seconds or null>}
+    #   response: {"returncode": <int>, "stdout": "...", "stderr": "...", "timeout": <bool>}
+    # `args` are the arguments of the verifier command, without the executable itself. A server that keeps
+    # the verifier loaded only pays the JVM startup and JIT warm-up once. A daemon that crashes or does not
+    # answer in time is killed and started again for the next job.
+    def __init__(self, server_command: List[str]):
+        self.server_command: List[str] = server_command
+        self.process: Optional[subprocess.Popen] = None # type: ignore
+        # Response lines of the current process, read by a thread so a request can wait with a timeout.
+        # None marks the end of its output.
+        self.lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        # Why the last request got no answer: "crashed" or "timed out"
+        self.failure: Optional[str] = None
+
+    def start(self) -> None:
+        self.process = subprocess.Popen(self.server_command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        self.lines = queue.Queue()
+        threading.Thread(target=self.read, args=(self.process.stdout, self.lines), daemon=True).start()
+
+    @staticmethod
+    def read(stream: IO[str], lines: "queue.Queue[Optional[str]]") -> None:
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+
+    def stop(self) -> None:
+        if self.process != None:
+            try:
+                self.process.kill() # type: ignore
+                self.process.wait() # type: ignore
+            except OSError:
+                pass
+            self.process = None
+
+    def restart(self) -> None:
+        self.stop()
+        self.start()
+
+    def request(self, args: List[str], timeout: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        # Returns None when the daemon crashed or did not answer in time, see `failure`
+        self.failure = "crashed"
+        if self.process == None or self.process.poll() != None: # type: ignore
+            self.restart()
+        p: subprocess.Popen = self.process # type: ignore
+        try:
+            p.stdin.write(json.dumps({"args": args, "timeout": timeout}) + "\n") # type: ignore
+            p.stdin.flush() # type: ignore
+        except OSError:
+            return None
+        try:
+            line = self.lines.get(timeout=None if timeout == None else timeout + DAEMON_GRACE)
+        except queue.Empty:
+            self.failure = "timed out"
+            return None
+        if line == None:
+            return None
+        self.failure = None
+        return json.loads(line)
+
+    def run_stats(self, command: List[str], log_file: Optional[str] = None, verbose: bool = False, timeout: Optional[int] = None) -> Tuple[float, Result, RunStats]:
+        # Only the wall time is measured here, unless the daemon reports the resources of the job as `stats`
+        start_time = time.time()
+        start = time.monotonic()
+        response = self.request(command[1:], timeout)
+        end = time.monotonic()
+        stats = RunStats(end - start)
+        out: Optional[str] = None
+        err_out: Optional[str] = None
+        if response == None:
+            print(f"Verifier daemon {self.failure} for command '{' '.join(command)}', restarting it")
+            res = Result.TimeOut if self.failure == "timed out" else Result.Error
+            self.restart()
+        else:
+            out = response.get("stdout")
+            err_out = response.get("stderr")
+            if response.get("stats"):
+                stats = RunStats.from_dict(dict(response["stats"], wall=end - start))
+            if response.get("timeout"):
+                res = Result.TimeOut
+            else:
+                res = result_from_returncode(response["returncode"], command)
+
+        report_run(command, res, start_time, end - start, out, err_out, log_file, verbose)
+        return end - start, res, stats
+
+    def run(self, command: List[str], log_file: Optional[str] = None, verbose: bool = False, timeout: Optional[int] = None) -> Tuple[float, Result]:
+        t, res, _ = self.run_stats(command, log_file, verbose, timeout)
+        return t, res
+
+class DaemonPool:
+    # A fixed number of verifier daemons that serve the commands of `executable`. `run` and `run_stats` have
+    # the same signature and result as `runCommand` and `runCommandStats`, so `run_stats` can be used as the
+    # runner of `Experiments`. Commands of other tools (e.g. Silicon on a Viper file) are run as a normal
+    # process by `runCommandStats`, since the daemons would run their arguments with the wrong tool.
+    def __init__(self, server_command: List[str], executable: str, size: int = 1):
+        self.executable: str = executable
+        self.daemons: List[VerifierDaemon] = [VerifierDaemon(server_command) for _ in range(size)]
+        self.idle: "queue.Queue[VerifierDaemon]" = queue.Queue()
+        for d in self.daemons:
+            d.start()
+            self.idle.put(d)
+
+    def run_stats(self, command: List[str], log_file: Optional[str] = None, verbose: bool = False, timeout: Optional[int] = None) -> Tuple[float, Result, RunStats]:
+        if command[0] != self.executable:
+            return runCommandStats(command, log_file, verbose, timeout)
+        daemon = self.idle.get()
+        try:
+            return daemon.run_stats(command, log_file, verbose, timeout)
+        finally:
+            self.idle.put(daemon)
+
+    def run(self, command: List[str], log_file: Optional[str] = None, verbose: bool = False, timeout: Optional[int] = None) -> Tuple[float, Result]:
+        t, res, _ = self.run_stats(command, log_file, verbose, timeout)
+        return t, res
+
+    def close(self) -> None:
+        for d in self.daemons:
+            d.stop()
+
+def serve_daemon(verifier: List[str]) -> None:
+    # Test server for the daemon protocol of `VerifierDaemon`: every request is run as `verifier + args`
+    # in a fresh process. It keeps nothing warm, so it is no faster than running the verifier directly;
+    # it only exists to test the daemon backend. Measuring the warm-up savings needs a server that keeps
+    # the verifier loaded between requests, which VerCors does not ship.
+    for line in sys.stdin:
+        if line.strip() == "":
+            continue
+        request = json.loads(line)
+        try:
+            p = subprocess.run(verifier + request["args"], capture_output=True, timeout=request.get("timeout"), text=True)
+            response = {"returncode": p.returncode, "stdout": p.stdout, "stderr": p.stderr, "timeout": False}
+        except subprocess.TimeoutExpired as to:
+            response = {"returncode": None, "timeout": True,
+                        "stdout": to.stdout.decode("utf-8") if to.stdout else None,
+                        "stderr": to.stderr.decode("utf-8") if to.stderr else None}
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+_tool_versions: Dict[str, str] = {}
+
+def tool_version(tool: str) -> str:
+    # The version string a tool reports, asked once per tool
+    if tool not in _tool_versions:
+        try:
+            p = subprocess.run([tool, "--version"], capture_output=True, timeout=60, text=True)
+            _tool_versions[tool] = (p.stdout + p.stderr).strip()
+        except (OSError, subprocess.TimeoutExpired):
+            _tool_versions[tool] = "unknown"
+    return _tool_versions[tool]
+
+class ResultCache:
+    # Stores the (time, Result) repetitions of earlier runs, keyed on the contents of the verified file,
+    # the full command line and the version of the verifier. Regenerating a byte-identical file therefore
+    # does not invalidate its results, while any change to the file, flags or tool does.
+    # When more than `max_entries` keys are stored, the least recently used ones are evicted.
+    def __init__(self, path: str = "cache/results.json", max_entries: int = 1000):
+        self.path: str = path
+        self.max_entries: int = max_entries
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.loads(f.read())
+
+    @staticmethod
+    def key(input_file: str, command: List[str], version: str) -> str:
+        h = hashlib.sha256()
+        with open(input_file, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                h.update(block)
+        h.update(b"\0" + "\0".join(command).encode("utf-8"))
+        h.update(b"\0" + version.encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, key: str) -> List[Tuple[float, Result]]:
+        with self.lock:
+            if key not in self.entries:
+                return []
+            entry = self.entries[key]
+            entry["last_used"] = time.time()
+            return [(float(t), Result(r)) for t, r in entry["results"]]
+
+    def put(self, key: str, file_name: str, results: List[Tuple[float, Result]]) -> None:
+        with self.lock:
+            self.entries[key] = {"file": file_name, "last_used": time.time(), "results": results}
+            if len(self.entries) > self.max_entries:
+                by_age = sorted(self.entries, key=lambda k: self.entries[k]["last_used"])
+                for k in by_age[:len(self.entries) - self.max_entries]:
+                    del self.entries[k]
+
+    def save(self) -> None:
+        with self.lock:
+            directory = os.path.dirname(self.path)
+            if directory != "":
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path + ".tmp", "w") as f:
+                f.write(json.dumps(self.entries))
+            os.replace(self.path + ".tmp", self.path)
+
+class ViperCache:
+    # Viper files emitted by VerCors, stored under the hash of their contents in `directory`. The index maps
+    # the key of the VerCors run that produced a file (see `ResultCache.key`) to that hash.
+    def __init__(self, directory: str = "cache/vpr"):
+        self.directory: str = directory
+        self.index_path: str = os.path.join(directory, "index.json")
+        self.index: Dict[str, str] = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.index = json.loads(f.read())
+
+    def lookup(self, key: str) -> Optional[str]:
+        if key in self.index:
+            path = os.path.join(self.directory, self.index[key] + ".vpr")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def add(self, key: str, vpr_file: str) -> str:
+        with open(vpr_file, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, digest + ".vpr")
+        if not os.path.exists(path):
+            shutil.copyfile(vpr_file, path + ".tmp")
+            os.replace(path + ".tmp", path)
+        self.index[key] = digest
+        with open(self.index_path + ".tmp", "w") as f:
+            f.write(json.dumps(self.index))
+        os.replace(self.index_path + ".tmp", self.index_path)
+        return path
+
+def cmake_generators(cmakelists: str = "CMakeLists.txt") -> Dict[str, Tuple[str, List[str], List[str]]]:
+    # For every generator in CMakeLists.txt: its source file, the files `build_unit_test` or `build_single_unit_test`
+    # generate from it, and the targets that build them
+    generators: Dict[str, Tuple[str, List[str], List[str]]] = {}
+    with open(cmakelists) as f:
+        for line in f:
+            m = re.match(r"\s*(build_unit_test|build_single_unit_test)\s*\(\s*TARGET\s+(\w+)\s+DIR\s+(\S+?)\s*\)", line)
+            if m == None:
+                continue
+            kind, target, directory = m.groups() # type: ignore
+            source = os.path.join(directory, target + ".cpp")
+            if kind == "build_unit_test":
+                outputs = [target + "_front.pvl"] + [f"{target}_{v}.c" for v in range(4)] + [f"{target}_{v}_mem.c" for v in range(4)]
+                generators[target] = (source, outputs, [target + "_pvl", target + "_pvl_mem"])
+            else:
+                generators[target] = (source, [target + "_mem.c"], [target + "_pvl"])
+    return generators
+
+def file_hash(path: str) -> Optional[str]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+# Bump when the metrics change, so cached metrics are computed again
+METRICS_VERSION = 1
+
+def scan_file(path: str) -> Tuple[str, Dict[str, Any]]:
+    # The hash of a file and its metrics: the line info, and for Halide sources the result of `scan_cpp`
+    with open(path, "rb") as f:
+        data = f.read()
+    # Newlines as when reading in text mode
+    text = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+    entry: Dict[str, Any] = {"line_info": scan_lines(text).__dict__}
+    if path.endswith(".cpp"):
+        anns, loc, sched_dict = scan_cpp(text)
+        entry["cpp"] = [anns, loc, {str(k): dict(v) for k, v in sched_dict.items()}]
+    return hashlib.sha256(data).hexdigest(), entry
+
+class MetricsIndex:
+    # Static metrics of source and generated files (lines of code and annotations, loops, and the schedule
+    # directives of Halide sources), cached in `path` under the hash of the file contents. A file is only
+    # scanned when its contents are new; files that are not cached yet are scanned in parallel.
+    def __init__(self, path: str = "cache/metrics.json", max_entries: int = 10000):
+        self.path: str = path
+        self.max_entries: int = max_entries
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                stored = json.load(f)
+            if stored.get("version") == METRICS_VERSION:
+                self.entries = stored["entries"]
+
+    def scan(self, paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        result: Dict[str, Dict[str, Any]] = {}
+        misses: List[str] = []
+        for path in paths:
+            digest = file_hash(path)
+            if digest == None:
+                raise FileNotFoundError(f"No such file: '{path}'")
+            if digest in self.entries:
+                result[path] = self.entries[digest] # type: ignore
+            else:
+                misses.append(path)
+        if len(misses) == 0:
+            return result
+        if len(misses) == 1:
+            scanned = [scan_file(misses[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=min(len(misses), os.cpu_count() or 1)) as pool:
+                scanned = list(pool.map(scan_file, misses))
+        with self.lock:
+            for path, (digest, entry) in zip(misses, scanned):
+                self.entries[digest] = entry
+                result[path] = entry
+        self.save()
+        return result
+
+    def line_infos(self, paths: List[str]) -> Dict[str, LineInfo]:
+        return {path: as_line_info(entry["line_info"]) for path, entry in self.scan(paths).items()} # type: ignore
+
+    def line_info(self, path: str) -> LineInfo:
+        return self.line_infos([path])[path]
+
+    def cpp_files(self, paths: List[str]) -> Dict[str, Tuple[int, int, Dict[int, Counter[str]]]]:
+        result: Dict[str, Tuple[int, int, Dict[int, Counter[str]]]] = {}
+        for path, entry in self.scan(paths).items():
+            anns, loc, sched_dict = entry["cpp"]
+            result[path] = (anns, loc, {int(k): Counter(v) for k, v in sched_dict.items()})
+        return result
+
+    def save(self) -> None:
+        with self.lock:
+            # The oldest entries go first, they are most likely of files that were regenerated since
+            for digest in list(self.entries)[:max(0, len(self.entries) - self.max_entries)]:
+                del self.entries[digest]
+            directory = os.path.dirname(self.path)
+            if directory != "":
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path + ".tmp", "w") as f:
+                f.write(json.dumps({"version": METRICS_VERSION, "entries": self.entries}))
+            os.replace(self.path + ".tmp", self.path)
+
+class CFunction:
+    # A function definition in a C file: its name, where its declaration (including the contract before it)
+    # starts, and where its body starts and ends (the `{` and one past the `}`)
+    def __init__(self, name: str, start: int, body_start: int, body_end: int, pure: bool):
+        self.name: str = name
+        self.start: int = start
+        self.body_start: int = body_start
+        self.body_end: int = body_end
+        self.pure: bool = pure
+
+    def __repr__(self) -> str:
+        return f"CFunction({self.name!r}, {self.start}, {self.body_start}, {self.body_end}, {self.pure})"
+
+def c_functions(text: str) -> List[CFunction]:
+    # Finds the top-level function definitions of a generated C file. Braces in comments (which includes the
+    # /*@ @*/ annotations), strings and preprocessor lines are skipped, as is the `extern "C" {` block.
+    functions: List[CFunction] = []
+    depth = 0
+    segment = 0 # Start of the current top-level declaration
+    body_start = 0
+    header = ""
+    i = 0
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if text.startswith("//", i) or (c == "#" and text[text.rfind("\n", 0, i) + 1:i].strip() == ""):
+            end = text.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        if text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if c == '"' or c == "'":
+            j = i + 1
+            while j < n and text[j] != c:
+                j += 2 if text[j] == "\\" else 1
+            i = j + 1
+            continue
+        if c == "{":
+            if depth == 0:
+                header = re.sub(r"/\*.*?\*/|//[^\n]*|^\s*#[^\n]*", " ", text[segment:i], flags=re.S | re.M).strip()
+                if header.startswith('extern "C"'):
+                    segment = i + 1
+                    i += 1
+                    continue
+                body_start = i
+            depth += 1
+        elif c == "}":
+            if depth == 0:
+                # The closing brace of `extern "C" {`
+                segment = i + 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    m = re.search(r"(\w+)\s*\([^()]*(\([^()]*\)[^()]*)*\)\s*$", header)
+                    if m != None and not header.startswith("struct"):
+                        pure = re.search(r"/\*@\s*pure\s*@\*/", text[segment:body_start]) != None
+                        functions.append(CFunction(m.group(1), segment, body_start, i + 1, pure)) # type: ignore
+                    segment = i + 1
+        elif c == ";" and depth == 0:
+            segment = i + 1
+        i += 1
+    return functions
+
+def trivial_body(body: str) -> bool:
+    # A function body with at most one statement and no loops, such as `void halide_unused(bool e){}`.
+    # Verifying it costs next to nothing, so a separate unit for it would only add a VerCors startup.
+    code = re.sub(r"/\*.*?\*/|//[^\n]*", " ", body[1:-1], flags=re.S)
+    return code.count(";") <= 1 and re.search(r"\b(for|while|do)\b", code) == None
+
+class CLoop:
+    # A loop in a C function: where it starts (the `for` or `while`), its body (the `{` and one past the `}`),
+    # the name of its loop variable if it declares one, and the loops directly in its body
+    def __init__(self, start: int, body_start: int, body_end: int, variable: Optional[str]):
+        self.start: int = start
+        self.body_start: int = body_start
+        self.body_end: int = body_end
+        self.variable: Optional[str] = variable
+        self.children: List["CLoop"] = []
+
+    def __repr__(self) -> str:
+        return f"CLoop({self.start}, {self.body_start}, {self.body_end}, {self.variable!r}, {self.children})"
+
+def blank_c(text: str) -> str:
+    # `text` with comments (so also the annotations), string literals and preprocessor lines replaced by spaces,
+    # so that positions stay the same and braces and keywords in them are not seen as code
+    pattern = r"/\*.*?\*/|//[^\n]*|\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'|^[ \t]*#[^\n]*"
+    return re.sub(pattern, lambda m: re.sub(r"[^\n]", " ", m.group(0)), text, flags=re.S | re.M)
+
+def matching(code: str, i: int, open_char: str, close_char: str) -> int:
+    # One past the bracket that closes the one at `i`, in code from `blank_c`
+    depth = 0
+    for j in range(i, len(code)):
+        if code[j] == open_char:
+            depth += 1
+        elif code[j] == close_char:
+            depth -= 1
+            if depth == 0:
+                return j + 1
+    return len(code)
+
+def c_loops(text: str, start: int, end: int) -> List[CLoop]:
+    # The outermost `for` and `while` loops between `start` and `end` (e.g. a function body), with the loops
+    # nested in them as children. Loops without braces around their body are skipped, as are `do` loops.
+    code = blank_c(text)
+    loops: List[CLoop] = []
+    for m in re.finditer(r"\b(for|while)\s*\(", code[:end]):
+        if m.start() < start:
+            continue
+        header_end = matching(code, m.end() - 1, "(", ")")
+        body_start = header_end + len(code[header_end:]) - len(code[header_end:].lstrip())
+        if body_start >= end or code[body_start] != "{":
+            continue
+        variable = re.match(r"\s*(?:\w+\s+)*?(\w+)\s*=", code[m.end():header_end])
+        loops.append(CLoop(m.start(), body_start, matching(code, body_start, "{", "}"),
+                           variable.group(1) if variable != None else None))
+    outermost: List[CLoop] = []
+    open_loops: List[CLoop] = []
+    for loop in loops:
+        while len(open_loops) > 0 and open_loops[-1].body_end <= loop.start:
+            open_loops.pop()
+        (open_loops[-1].children if len(open_loops) > 0 else outermost).append(loop)
+        open_loops.append(loop)
+    return outermost
+
+def loop_nests(loops: List[CLoop]) -> List[CLoop]:
+    # The loop nests that become units: a loop with, directly or below a single inner loop, several loop nests
+    # in its body (such as the outer loops of a Halide pipeline, which produce several stages per iteration)
+    # is split into those nests
+    nests: List[CLoop] = []
+    for loop in loops:
+        inner = loop
+        while len(inner.children) == 1:
+            inner = inner.children[0]
+        nests += loop_nests(inner.children) if len(inner.children) > 1 else [loop]
+    return nests
+
+# Body of a loop that is verified in another unit. The loop invariants (or the iteration contract of a parallel
+# loop) still hold after the loop, but the body is not checked: assuming false makes every iteration trivially
+# preserve them, so code after the loop is verified against what the invariants promise.
+SKIPPED_LOOP_BODY = "{ /*@ assume false; @*/ }"
+
+def split_verification_units(path: str, out_dir: str) -> Dict[str, str]:
+    # Splits a C file into verification units: one per loop nest (see `loop_nests`) of every function that is
+    # not pure or trivial, or one for the whole function if it has at most one loop nest. A unit is the whole
+    # file, with the bodies of the other such functions replaced by `;`, so they are only used through their
+    # contracts, and with the bodies of the other loop nests of its function skipped (see SKIPPED_LOOP_BODY).
+    # The code outside the loop nests is verified in every unit of its function. Pure and trivial functions
+    # keep their bodies in every unit. Files with a single unit, and PVL files, are not split.
+    if not path.endswith(".c"):
+        return {"": path}
+    with open(path) as f:
+        text = f.read()
+    functions = [fn for fn in c_functions(text) if not fn.pure and not trivial_body(text[fn.body_start:fn.body_end])]
+    # Per unit: its name, and the parts of the file replaced in it (start, end, replacement)
+    units: List[Tuple[str, List[Tuple[int, int, str]]]] = []
+    for fn in functions:
+        others = [(other.body_start, other.body_end, ";") for other in functions if other is not fn]
+        nests = loop_nests(c_loops(text, fn.body_start, fn.body_end))
+        if len(nests) <= 1:
+            units.append((fn.name, others))
+            continue
+        names: Counter[str] = Counter()
+        for i, nest in enumerate(nests):
+            name = fn.name + "." + (nest.variable if nest.variable != None else str(i))
+            names[name] += 1
+            if names[name] > 1:
+                name += f".{names[name]}"
+            skipped = [(other.body_start, other.body_end, SKIPPED_LOOP_BODY) for other in nests if other is not nest]
+            units.append((name, others + skipped))
+    if len(units) <= 1:
+        return {"": path}
+    os.makedirs(out_dir, exist_ok=True)
+    result: Dict[str, str] = {}
+    for name, replaced in units:
+        parts: List[str] = []
+        last = 0
+        for start, end, replacement in sorted(replaced):
+            parts.append(text[last:start])
+            parts.append(replacement)
+            last = end
+        parts.append(text[last:])
+        unit_path = os.path.join(out_dir, name + ".c")
+        with open(unit_path, "w") as f:
+            f.write("".join(parts))
+        result[name] = unit_path
+    return result
+
+def combine_results(results: List[Result]) -> Result:
+    # The result of a file from the results of its units: any failure fails the file, then errors, then
+    # running out of memory, then timeouts
+    for r in (Result.Fail, Result.Error, Result.OutOfMemory, Result.TimeOut):
+        if r in results:
+            return r
+    return Result.Pass
+
+# A single verification run: one repetition of one file with one command
+class Job:
+    def __init__(self, file_name: str, command: List[str], log_file: Optional[str] = None, repetition: int = 0,
+            input_file: Optional[str] = None):
+        self.file_name: str = file_name
+        self.command: List[str] = command
+        self.log_file: Optional[str] = log_file
+        self.repetition: int = repetition
+        # The file that is verified, by default the last argument of the command
+        self.input_file: str = input_file if input_file != None else command[-1]
+        # Identifies the configuration (command line) of the run
+        self.config: str = hashlib.sha1("\0".join(command).encode("utf-8")).hexdigest()[:12]
+
+    def __repr__(self) -> str:
+        return f"Job({self.file_name!r}, repetition={self.repetition})"
+
+class ResultStore:
+    # Append-only record of finished runs, one JSON object per line in `<prefix>_runs.jsonl`. Every
+    # repetition is written and synced to disk as soon as it completes, so a crashed run loses at most
+    # the repetitions that were still running. A truncated last line from a crash is ignored when reading.
+    def __init__(self, path: str):
+        self.path: str = path
+        self.lock = threading.Lock()
+        # Terminate a line that was cut off by a crash, so new records start on their own line
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb+") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+
+    # `cached` marks a repetition that was taken from the result cache instead of being run
+    def append(self, job: Job, t: float, res: Result, stats: Optional[RunStats] = None, cached: bool = False) -> None:
+        line = json.dumps({"file": job.file_name, "repetition": job.repetition, "config": job.config,
+                           "command": " ".join(job.command), "time": t, "result": res, "stats": stats,
+                           "cached": cached, "finished": datetime.datetime.now().isoformat()}, cls=Encoder)
+        with self.lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def records(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return []
+        records: List[Dict[str, Any]] = []
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return records
+
+    def completed(self) -> Dict[Tuple[str, int, str], Tuple[float, Result, Optional[RunStats]]]:
+        # The last result of every (file, repetition, config) cell
+        done: Dict[Tuple[str, int, str], Tuple[float, Result, Optional[RunStats]]] = {}
+        for r in self.records():
+            stats = RunStats.from_dict(r["stats"]) if r.get("stats") else None
+            done[(r["file"], r["repetition"], r["config"])] = (float(r["time"]), Result(r["result"]), stats)
+        return done
+
+    def results(self) -> Tuple[VerificationResults, RunStatsResults]:
+        # Results per file ordered by repetition. If a repetition was run more than once, the last run counts.
+        latest: Dict[str, Dict[int, Tuple[float, Result, Optional[RunStats]]]] = defaultdict(dict)
+        for (file_name, repetition, _), result in self.completed().items():
+            latest[file_name][repetition] = result
+        verification_times: VerificationResults = {}
+        run_stats: RunStatsResults = {}
+        for file_name in latest:
+            reps = sorted(latest[file_name])
+            verification_times[file_name] = [latest[file_name][i][:2] for i in reps] # type: ignore
+            run_stats[file_name] = [latest[file_name][i][2] for i in reps]
+        return verification_times, run_stats
+
+class WorkQueue:
+    # Hands out jobs to worker processes, possibly on other machines, through a spool directory on a shared
+    # file system. A job is a JSON file that moves from `queue/` to `claimed/` (by the worker that runs it)
+    # and whose result ends up in `done/`. Every move is an atomic rename, so each job is claimed once.
+    # While running a job, a worker touches its claimed file every `heartbeat` seconds. Jobs whose claim
+    # was not touched for `heartbeat_timeout` seconds are put back in the queue, as their worker is lost.
+    # Workers run from the same directory as the experiments, so the commands and log files are the same.
+    def __init__(self, directory: str = "spool", heartbeat_timeout: float = 60, poll: float = 0.5):
+        self.directory: str = directory
+        self.heartbeat_timeout: float = heartbeat_timeout
+        self.poll: float = poll
+        for d in ("queue", "claimed", "done", "tmp"):
+            os.makedirs(os.path.join(directory, d), exist_ok=True)
+        # Stale claims seen in the previous poll, with their modification time
+        self.stale: Dict[str, float] = {}
+
+    def path(self, *parts: str) -> str:
+        return os.path.join(self.directory, *parts)
+
+    def write(self, sub_dir: str, name: str, content: Dict[str, Any]) -> None:
+        tmp = self.path("tmp", name)
+        with open(tmp, "w") as f:
+            f.write(json.dumps(content, cls=Encoder))
+        os.replace(tmp, self.path(sub_dir, name))
+
+    def submit(self, jobs: List[Job], env: Optional[Dict[str, str]] = None) -> List[str]:
+        # Queues the jobs and returns their ids. Workers take the jobs in the given order, and run them with
+        # the extra environment variables `env` (see `Experiments.job_environment`).
+        stamp = int(time.time() * 1000)
+        ids: List[str] = []
+        for i, job in enumerate(jobs):
+            job_id = f"{stamp:013d}-{i:06d}-{uuid.uuid4().hex[:8]}"
+            self.write("queue", job_id + ".json", {"file": job.file_name, "command": job.command, "log_file": job.log_file,
+                                                   "repetition": job.repetition, "input_file": job.input_file, "env": env})
+            ids.append(job_id)
+        return ids
+
+    def requeue_lost(self) -> None:
+        # A claim counts as lost when it is stale in two polls in a row, so a claim that a worker just renamed
+        # (which keeps the old modification time until the worker touches it) is not taken away
+        now = time.time()
+        stale: Dict[str, float] = {}
+        for name in os.listdir(self.path("claimed")):
+            try:
+                mtime = os.path.getmtime(self.path("claimed", name))
+            except FileNotFoundError:
+                continue
+            if now - mtime < self.heartbeat_timeout:
+                continue
+            if self.stale.get(name) == mtime:
+                job_id, worker = name[:-len(".json")].split(".", 1)
+                try:
+                    os.rename(self.path("claimed", name), self.path("queue", job_id + ".json"))
+                    print(f"Worker '{worker}' lost job {job_id}, queued it again")
+                except FileNotFoundError:
+                    pass
+            else:
+                stale[name] = mtime
+        self.stale = stale
+
+    def wait(self, ids: List[str], on_result: Callable[[str, float, Result, Optional[RunStats]], None]) -> None:
+        # Waits until every job in `ids` is done, and calls `on_result` for each as soon as it is
+        pending = set(ids)
+        while len(pending) > 0:
+            for name in sorted(os.listdir(self.path("done"))):
+                job_id = name[:-len(".json")]
+                if job_id not in pending:
+                    continue
+                with open(self.path("done", name)) as f:
+                    done = json.load(f)
+                os.remove(self.path("done", name))
+                # A job that was queued again may still be waiting for a worker
+                for left_over in [self.path("queue", name)] + [self.path("claimed", c) for c in os.listdir(self.path("claimed"))
+                                                                 if c.startswith(job_id + ".")]:
+                    try:
+                        os.remove(left_over)
+                    except FileNotFoundError:
+                        pass
+                pending.remove(job_id)
+                stats = RunStats.from_dict(done["stats"]) if done.get("stats") else None
+                on_result(job_id, float(done["time"]), Result(done["result"]), stats)
+            if len(pending) > 0:
+                self.requeue_lost()
+                time.sleep(self.poll)
+
+    def claim(self, worker: str) -> Optional[Tuple[str, Job, Optional[Dict[str, str]]]]:
+        for name in sorted(os.listdir(self.path("queue"))):
+            job_id = name[:-len(".json")]
+            claimed = self.path("claimed", f"{job_id}.{worker}.json")
+            try:
+                os.rename(self.path("queue", name), claimed)
+            except FileNotFoundError:
+                # Another worker was first
+                continue
+            os.utime(claimed)
+            with open(claimed) as f:
+                spec = json.load(f)
+            job = Job(spec["file"], spec["command"], spec["log_file"], spec["repetition"], spec["input_file"])
+            return job_id, job, spec.get("env")
+        return None
+
+    def stop_workers(self) -> None:
+        # Workers stop once their current job is done
+        open(self.path("stop"), "w").close()
+
+def run_worker(directory: str = "spool", worker: Optional[str] = None, heartbeat: float = 10, idle_exit: Optional[float] = None,
+        runner: Optional[Runner] = None) -> None:
+    # Runs jobs from the spool directory of a `WorkQueue`, one at a time, until `<directory>/stop` exists
+    # or no job came in for `idle_exit` seconds. Start several workers to run jobs in parallel.
+    spool = WorkQueue(directory)
+    name = worker if worker != None else f"{socket.gethostname()}-{os.getpid()}"
+    run: Runner = runner if runner != None else runCommandStats # type: ignore
+    idle_since = time.monotonic()
+    print(f"Worker '{name}' waiting for jobs in '{directory}'")
+    while not os.path.exists(spool.path("stop")):
+        claim = spool.claim(name) # type: ignore
+        if claim == None:
+            if idle_exit != None and time.monotonic() - idle_since > idle_exit:
+                break
+            time.sleep(spool.poll)
+            continue
+        job_id, job, env = claim # type: ignore
+        claimed = spool.path("claimed", f"{job_id}.{name}.json")
+        finished = threading.Event()
+
+        def beat() -> None:
+            while not finished.wait(heartbeat):
+                try:
+                    os.utime(claimed)
+                except FileNotFoundError:
+                    # The coordinator gave the job to another worker
+                    return
+
+        beater = threading.Thread(target=beat, daemon=True)
+        beater.start()
+        try:
+            if env != None and run is runCommandStats:
+                t, res, stats = runCommandStats(job.command, job.log_file, False, None, env=env)
+            else:
+                if env != None:
+                    print(f"The runner of worker '{name}' does not take the environment {env}, running without it")
+                t, res, stats = run(job.command, job.log_file, False, None)
+        except Exception as e:
+            print(e)
+            t, res, stats = 0.0, Result.Error, None
+        finished.set()
+        beater.join()
+        spool.write("done", job_id + ".json", {"worker": name, "time": t, "result": res, "stats": stats})
+        try:
+            os.remove(claimed)
+        except FileNotFoundError:
+            pass
+        print(job.file_name, (t, res))
+        idle_since = time.monotonic()
+    print(f"Worker '{name}' stopped")
+
+def least_squares(xs: List[List[float]], ys: List[float], ridge: float = 1e-6) -> List[float]:
+    # Coefficients c minimising |X c - y|^2 (plus a little ridge regularisation), via the normal equations
+    n = len(xs[0])
+    a = [[sum(x[i] * x[j] for x in xs) + (ridge if i == j else 0.0) for j in range(n)] for i in range(n)]
+    b = [sum(x[i] * y for x, y in zip(xs, ys)) for i in range(n)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+        a[col], a[pivot] = a[pivot], a[col]
+        b[col], b[pivot] = b[pivot], b[col]
+        if a[col][col] == 0:
+            continue
+        for r in range(n):
+            if r != col:
+                f = a[r][col] / a[col][col]
+                a[r] = [v - f * w for v, w in zip(a[r], a[col])]
+                b[r] -= f * b[col]
+    return [b[i] / a[i][i] if a[i][i] != 0 else 0.0 for i in range(n)]
+
+class JobPlanner:
+    # Estimates how long each job takes from earlier results, and orders jobs longest first.
+    # A file that was run before is estimated by the median of its earlier times, where timeouts count
+    # as the full `timeout`. Other files are estimated with a least squares fit of the time on their
+    # line info (lines of code, annotations, loops) over the files that were run before. Line info that
+    # is not given is looked up in `metrics`, for the files in build/.
+    def __init__(self, history: List[VerificationResults], line_infos: Dict[str, LineInfo], timeout: float,
+            metrics: Optional[MetricsIndex] = None):
+        self.timeout: float = timeout
+        self.line_infos: Dict[str, LineInfo] = dict(line_infos)
+        self.metrics: Optional[MetricsIndex] = metrics
+        self.times: Dict[str, List[float]] = defaultdict(list)
+        for results in history:
+            for file_name, xs in results.items():
+                for t, r in xs:
+                    self.times[file_name].append(float(timeout) if r == Result.TimeOut else min(t, timeout))
+        self.known: Dict[str, float] = {f: statistics.median(ts) for f, ts in self.times.items() if len(ts) > 0}
+        self.coefficients: Optional[List[float]] = None
+        fitted = [f for f in self.known if self.line_info(f) != None]
+        if len(fitted) >= 2:
+            self.coefficients = least_squares([self.features(f) for f in fitted], [self.known[f] for f in fitted])
+        self.default: float = statistics.median(self.known.values()) if len(self.known) > 0 else float(timeout)
+
+    def line_info(self, file_name: str) -> Optional[LineInfo]:
+        if file_name not in self.line_infos and self.metrics != None and os.path.exists("build/" + file_name):
+            self.line_infos[file_name] = self.metrics.line_info("build/" + file_name) # type: ignore
+        return self.line_infos.get(file_name)
+
+    def features(self, file_name: str) -> List[float]:
+        li: LineInfo = self.line_info(file_name) # type: ignore
+        return [1.0, float(li.lines_of_code), float(li.nr_annotations), float(li.loops)]
+
+    def estimate(self, file_name: str) -> float:
+        if file_name in self.known:
+            return self.known[file_name]
+        if self.coefficients != None and self.line_info(file_name) != None:
+            prediction = sum(c * x for c, x in zip(self.coefficients, self.features(file_name))) # type: ignore
+            return min(max(prediction, min(self.known.values())), self.timeout)
+        return self.default
+
+    def plan(self, jobs: List[Job], workers: int) -> Tuple[List[Job], List[Tuple[Job, int, float, float]], float]:
+        # Longest-processing-time-first order, the predicted schedule when a pool of `workers` takes the jobs
+        # in that order (job, worker, start, end), and the predicted total wall time
+        ordered = sorted(jobs, key=lambda j: self.estimate(j.file_name), reverse=True)
+        free = [(0.0, w) for w in range(max(1, workers))]
+        heapq.heapify(free)
+        schedule: List[Tuple[Job, int, float, float]] = []
+        for job in ordered:
+            start, w = heapq.heappop(free)
+            end = start + self.estimate(job.file_name)
+            schedule.append((job, w, start, end))
+            heapq.heappush(free, (end, w))
+        return ordered, schedule, max((end for _, _, _, end in schedule), default=0.0)
+
+    def print_plan(self, jobs: List[Job], workers: int) -> None:
+        _, schedule, total = self.plan(jobs, workers)
+        print(f"Predicted schedule of {len(jobs)} jobs on {workers} workers:")
+        for job, w, start, end in schedule:
+            print(f"  worker {w}: {start:8.1f}s - {end:8.1f}s  {job.file_name} #{job.repetition}")
+        print(f"Predicted total wall time: {datetime.timedelta(seconds=round(total))}")
+
+class Progress:
+    # Prints how many jobs are done, and the estimated time until all are done. The estimate comes from
+    # the planner when there is one, otherwise from the average time of the jobs that finished so far.
+    def __init__(self, jobs: List[Job], workers: int, planner: Optional[JobPlanner] = None):
+        self.remaining: List[Job] = list(jobs)
+        self.total: int = len(jobs)
+        self.workers: int = workers
+        self.planner: Optional[JobPlanner] = planner
+        self.start: float = time.monotonic()
+        self.times: List[float] = []
+        # Redraw a single status line on a terminal, print a line per job elsewhere (e.g. in a batch log)
+        self.live: bool = sys.stdout.isatty()
+
+    def eta(self) -> Optional[float]:
+        if self.planner != None:
+            return self.planner.plan(self.remaining, self.workers)[2] # type: ignore
+        if len(self.times) == 0:
+            return None
+        return statistics.mean(self.times) * math.ceil(len(self.remaining) / self.workers)
+
+    def status(self) -> str:
+        done = self.total - len(self.remaining)
+        elapsed = datetime.timedelta(seconds=round(time.monotonic() - self.start))
+        eta = self.eta()
+        eta_str = str(datetime.timedelta(seconds=round(eta))) if eta != None else "?"
+        return f"[{done}/{self.total}] {100 * done / max(1, self.total):.0f}%, elapsed {elapsed}, ETA {eta_str}"
+
+    def show(self) -> None:
+        if self.live:
+            print("\r\033[K" + self.status(), end="", flush=True)
+
+    def finished(self, job: Job, t: float, line: str) -> None:
+        self.remaining.remove(job)
+        self.times.append(t)
+        if self.live:
+            print("\r\033[K" + line)
+            self.show()
+        else:
+            print(line, " ", self.status())
+
+    def close(self) -> None:
+        if self.live:
+            print()
 
 class Experiments:
-    def __init__(self, versions: Dict[str, List[str]], mem_versions: Dict[str, List[str]], vercors_loc: str, silicon_loc: str, repetitions: int = 5, timeout: int = 10*60):
+    def __init__(self, versions: Dict[str, List[str]], mem_versions: Dict[str, List[str]], vercors_loc: str, silicon_loc: str, repetitions: int = 5, timeout: int = 10*60, max_workers: int = 1):
         self.versions: Dict[str, List[str]] = versions
         self.mem_versions: Dict[str, List[str]] = mem_versions
         self.line_infos: Dict[str,LineInfo] = {}
         self.verification_times: Dict[str, List[Tuple[float, Result]]] = {}
+        # Resources used by each run in `verification_times`, None where they are unknown
+        self.run_stats: RunStatsResults = {}
 
         self.vercors_loc = vercors_loc
         self.silicon_loc = silicon_loc
 
         self.repetitions = repetitions
         self.timeout = timeout
+        # Let VerCors print its progress, which is needed to split runs into phases
+        self.progress = False
+        # Upper bound on the number of verifications running at the same time.
+        # Keep this at 1 for timing-sensitive runs, so every job has the machine to itself.
+        self.max_workers = max_workers
+        # How commands are executed, either `runCommandStats` or the `run_stats` of a warm `DaemonPool`
+        self.runner: Runner = runCommandStats
+        self.daemons: Optional[DaemonPool] = None
+        # Earlier results that are reused instead of verifying again, see `use_cache`
+        self.cache: Optional[ResultCache] = None
+        # Where every finished run is appended immediately, see `open_store`
+        self.store: Optional[ResultStore] = None
+        # Runs from the store that are not run again when resuming
+        self.completed: Dict[Tuple[str, int, str], Tuple[float, Result, Optional[RunStats]]] = {}
+        # For files run with `run_portfolio`, the configuration that won each repetition
+        self.portfolio_winners: Dict[str, List[Optional[str]]] = {}
+        # Orders jobs longest expected first, see `use_history`
+        self.planner: Optional[JobPlanner] = None
+        # Cached line counts and directives of the source and generated files
+        self.metrics: MetricsIndex = MetricsIndex()
+        # Runs the jobs on worker processes instead of locally, see `use_spool`
+        self.spool: Optional[WorkQueue] = None
+        # Run the jobs as asyncio subprocesses (with a live progress line), see `run_async`.
+        # Each job is killed after `job_timeout` seconds, by default the timeout plus a minute, also when
+        # it runs otherwise (a daemon that does not answer in time is restarted).
+        self.asynchronous: bool = False
+        self.job_timeout: Optional[float] = None
+        # Only start jobs when there is memory for them, see `use_memory_limits`
+        self.memory: Optional[MemoryGate] = None
+        # Expected memory of a file that did not run before, in bytes
+        self.default_memory: int = 4 * 2**30
+        # Maximum heap of the JVM and memory of Z3 per run, in MB, None for their defaults
+        self.jvm_heap_mb: Optional[int] = None
+        self.z3_memory_mb: Optional[int] = None
+        # Benchmark-grade runs on dedicated cores, see `use_isolation`
+        self.isolation: Optional[Isolation] = None
+        self.cores: Optional[CorePool] = None
 
     def __str__(self) -> str:
         result = "{"
@@ -210,94 +2051,677 @@ class Experiments:
         return name + ('_' + version if version != '' else '') + ('_mem' if mem else '') + ext
 
     def count_files(self) -> None:
+        # The files are counted through `metrics`, so only new or changed files are scanned
+        names: List[str] = []
         for n in self.versions:
             for v in self.versions[n]:
-                name = self.version_to_file_name(n, v)
-                line_info = count_lines("build/" + name)
-                self.line_infos[name] = line_info
-                print(name)
-                print(line_info)
+                names.append(self.version_to_file_name(n, v))
             # Count front file
-            v = 'front'
-            name = self.version_to_file_name(n, v)
-            line_info = count_lines("build/" + name)
-            self.line_infos[name] = line_info
-            print(name)
-            print(line_info)
+            names.append(self.version_to_file_name(n, 'front'))
         for n in self.mem_versions:
             for v in self.mem_versions[n]:
-                name = self.version_to_file_name(n, v, True)
-                line_info = count_lines("build/" + name)
-                self.line_infos[name] = line_info
-                print(name)
-                print(line_info)
-    
-    def run_verification(self, file_name: str, repetitions: Optional[int] = None, timeout: Optional[int] = None, useAPI= False)-> None:
-        n: int = repetitions if repetitions != None else  self.repetitions # type: ignore
+                names.append(self.version_to_file_name(n, v, True))
+        line_infos = self.metrics.line_infos(["build/" + name for name in names])
+        for name in names:
+            self.line_infos[name] = line_infos["build/" + name]
+            print(name)
+            print(self.line_infos[name])
+
+    # `backend_options` are passed on to Silicon, `file_base` is where the Viper file is written (by default the file itself)
+    def verification_command(self, file_name: str, timeout: Optional[int] = None, useAPI = False,
+            backend_options: Optional[List[str]] = None, file_base: Optional[str] = None) -> List[str]:
         t = timeout if timeout != None else self.timeout
-        command = [self.vercors_loc ,"--dev-assert-timeout", "0"] + \
+        options: List[str] = (backend_options if backend_options != None else []) + self.prover_memory_options() # type: ignore
+        return [self.vercors_loc ,"--dev-assert-timeout", "0"] + \
                 (["--backend-option", "--prover=Z3-API"] if useAPI else []) + \
+                [arg for o in options for arg in ("--backend-option", o)] + \
+                (["--progress"] if self.progress else []) + \
                 ["--silicon-quiet"
                 ,"--no-infer-heap-context-into-frame"
                 ,"--dev-total-timeout", str(t)
-                ,"--backend-file-base" ,"build/" + file_name 
+                ,"--backend-file-base" ,"build/" + (file_base if file_base != None else file_name)
                 ,"build/" + file_name]
-        try:
-            self.verification_times[file_name] = []
-            for i in range(0,n):
-                verificationTime = runCommand(command, log_file="logs/"+ file_name + ".txt")
-                self.verification_times[file_name].append(verificationTime)
-                print(file_name, verificationTime)
-        except Exception as e:
-            print(e)
 
-    def run_silicon(self, file_name: str, repetitions: Optional[int] = None, timeout: Optional[int] = None)-> None:
+    # `first` is the index of the first repetition, for adding repetitions to earlier ones
+    def verification_jobs(self, file_name: str, repetitions: Optional[int] = None, timeout: Optional[int] = None, useAPI = False,
+            first: int = 0) -> List[Job]:
         n: int = repetitions if repetitions != None else  self.repetitions # type: ignore
+        command = self.verification_command(file_name, timeout, useAPI)
+        return [Job(file_name, command, "logs/"+ file_name + ".txt", i) for i in range(first, first+n)]
+
+    def silicon_command(self, timeout: Optional[int] = None, useAPI = False) -> List[str]:
         t = timeout if timeout != None else self.timeout
-        silicon_command = [self.silicon_loc, "--logLevel", "INFO", "--timeout", str(t)]
+        return [self.silicon_loc, "--logLevel", "INFO", "--timeout", str(t)] + (["--prover=Z3-API"] if useAPI else []) + \
+                self.prover_memory_options()
+
+    def prover_memory_options(self) -> List[str]:
+        # Silicon passes the prover arguments on to Z3, whose `memory_max_size` is in MB
+        return [f"--proverArgs=memory_max_size={self.z3_memory_mb}"] if self.z3_memory_mb != None else []
+
+    def job_environment(self) -> Optional[Dict[str, str]]:
+        # The JVM picks up JAVA_TOOL_OPTIONS, also when it is started by the `vct` script
+        if self.jvm_heap_mb == None:
+            return None
+        options = os.environ.get("JAVA_TOOL_OPTIONS", "")
+        return {"JAVA_TOOL_OPTIONS": (options + " " if options != "" else "") + f"-Xmx{self.jvm_heap_mb}m"}
+
+    def use_memory_limits(self, reserve_mb: int = 1024, jvm_heap_mb: Optional[int] = None, z3_memory_mb: Optional[int] = None,
+            default_mb: Optional[int] = None) -> None:
+        # Run jobs concurrently only as far as the memory allows, see `MemoryGate`, keeping `reserve_mb` free.
+        # A file is expected to use the largest peak memory of its earlier runs, or `default_mb` (by default
+        # the limits, when given) if it did not run before. The limits apply to every run; runs that hit them
+        # are reported as `Result.OutOfMemory`. Daemons keep the heap they were started with.
+        self.memory = MemoryGate(reserve_mb * 2**20)
+        self.jvm_heap_mb = jvm_heap_mb
+        self.z3_memory_mb = z3_memory_mb
+        if default_mb != None:
+            self.default_memory = default_mb * 2**20 # type: ignore
+        elif jvm_heap_mb != None or z3_memory_mb != None:
+            # The heap plus the JVM's own overhead, and Z3
+            self.default_memory = int(((jvm_heap_mb or 0) * 1.25 + (z3_memory_mb or 0)) * 2**20) # type: ignore
+
+    def use_isolation(self, cores_per_job: int = 1, max_interference: float = 0.05, max_load: Optional[float] = None,
+            reruns: int = 2) -> None:
+        # Pin every run to cores of its own (with `taskset`) and repeat runs that were disturbed by other processes,
+        # see `Isolation`. At most as many jobs run at the same time as there are sets of cores. Runs always start
+        # as separate processes, also when daemons or asyncio are used otherwise.
+        # The harness itself moves to a core of its own when there is one to spare, see `CorePool`.
+        self.isolation = Isolation(cores_per_job, max_interference, max_load, reruns)
+        self.cores = CorePool(cores_per_job)
+        if self.cores.harness != None:
+            pin_threads([self.cores.harness]) # type: ignore
+        if self.cores.size < self.max_workers:
+            print(f"Only {self.cores.size} jobs can run at the same time with {cores_per_job} cores each")
+
+    def stop_isolation(self) -> None:
+        if self.cores != None and self.cores.harness != None:
+            pin_threads(self.cores.cores) # type: ignore
+        self.isolation = None
+        self.cores = None
+
+    def run_isolated(self, job: Job, env: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> Tuple[float, Result, RunStats]:
+        cpus = self.cores.acquire() # type: ignore
+        try:
+            for attempt in range(self.isolation.reruns + 1): # type: ignore
+                t, res, stats = runCommandStats(job.command, job.log_file, False, timeout, env=env, cpus=cpus) # type: ignore
+                reasons = self.isolation.noise(stats, cpus) # type: ignore
+                if len(reasons) == 0:
+                    break
+                again = attempt < self.isolation.reruns # type: ignore
+                print(f"{job.file_name} #{job.repetition} was disturbed ({', '.join(reasons)}), " +
+                      ("running it again" if again else "keeping it anyway"))
+        finally:
+            self.cores.release(cpus) # type: ignore
+        return t, res, stats
+
+    def memory_estimate(self, file_name: str) -> int:
+        peaks = [s.peak_rss if s.peak_rss != None else s.max_rss for s in self.run_stats.get(file_name, []) if s != None]
+        peaks = [p for p in peaks if p != None]
+        # Some margin, as the peak varies from run to run
+        return int(max(peaks) * 1.2) if len(peaks) > 0 else self.default_memory # type: ignore
+
+    def silicon_jobs(self, file_name: str, repetitions: Optional[int] = None, timeout: Optional[int] = None, first: int = 0) -> List[Job]:
+        n: int = repetitions if repetitions != None else  self.repetitions # type: ignore
+        silicon_command = self.silicon_command(timeout)
+        vpr_fn = file_name + "-0.vpr"
+        return [Job(vpr_fn, silicon_command + ["build/" + vpr_fn], "logs/"+ vpr_fn + ".txt", i) for i in range(first, first+n)]
+
+    def jobs_for(self, file_name: str, repetitions: Optional[int] = None, timeout: Optional[int] = None, first: int = 0) -> List[Job]:
+        # Jobs for any file in `verification_times`, with the same options the experiments use for it:
+        # front end files without and back end files with the Z3 API, and Viper files with Silicon.
+        if file_name.endswith("-0.vpr"):
+            return self.silicon_jobs(file_name[:-len("-0.vpr")], repetitions, timeout, first)
+        return self.verification_jobs(file_name, repetitions, timeout, useAPI=not file_name.endswith(".pvl"), first=first)
+
+    def use_cache(self, path: str = "cache/results.json", max_entries: int = 1000) -> None:
+        self.cache = ResultCache(path, max_entries)
+
+    def use_history(self, directory: str = "results") -> None:
+        # Plan jobs with the results of all earlier runs in `directory`, and their line info
+        history = load_history(directory)
+        line_infos: Dict[str, LineInfo] = {}
+        for prefix in history:
+            if os.path.exists(prefix + "_line_info.json"):
+                with open(prefix + "_line_info.json") as f:
+                    line_infos.update(json.loads(f.read(), object_hook=as_line_info))
+        line_infos.update(self.line_infos)
+        self.planner = JobPlanner(list(history.values()), line_infos, self.timeout, self.metrics)
+
+    def use_spool(self, directory: str = "spool", heartbeat_timeout: float = 60) -> None:
+        # Hand out all jobs to workers started with `python preprocess.py worker <directory>`, on this or other
+        # machines sharing the directory. The results are still collected (and stored) here.
+        self.spool = WorkQueue(directory, heartbeat_timeout)
+        # Left behind by `stop_spool` of an earlier session
+        if os.path.exists(self.spool.path("stop")):
+            os.remove(self.spool.path("stop"))
+
+    def stop_spool(self) -> None:
+        if self.spool != None:
+            self.spool.stop_workers() # type: ignore
+            self.spool = None
+
+    def open_store(self, prefix: str, resume: bool = False) -> None:
+        # Append every finished run to `<prefix>_runs.jsonl`. With `resume`, runs of the same file,
+        # repetition and command that are already in the store are taken from it instead of run again.
+        # Without it, an existing store is moved aside to `<prefix>_runs.jsonl.<n>`, as its runs would
+        # otherwise be mixed with the new ones when the results are loaded.
+        path = prefix + "_runs.jsonl"
+        if not resume and os.path.exists(path):
+            n = 1
+            while os.path.exists(f"{path}.{n}"):
+                n += 1
+            os.replace(path, f"{path}.{n}")
+            print(f"Moved the earlier runs in '{path}' to '{path}.{n}'")
+        self.store = ResultStore(path)
+        self.completed = self.store.completed() if resume else {}
+
+    def cached_results(self, jobs: List[Job], force: bool = False) -> Tuple[Dict[str, str], Dict[str, List[Tuple[float, Result]]]]:
+        # The cache key and the cached repetitions of every file in `jobs`.
+        # With `force` nothing is reused, but the fresh results are still stored.
+        keys: Dict[str, str] = {}
+        cached: Dict[str, List[Tuple[float, Result]]] = {}
+        if self.cache == None:
+            return keys, cached
+        for job in jobs:
+            if job.file_name in keys:
+                continue
+            try:
+                keys[job.file_name] = self.cache.key(job.input_file, job.command, tool_version(job.command[0])) # type: ignore
+            except OSError as e:
+                print(e)
+                continue
+            cached[job.file_name] = [] if force else self.cache.get(keys[job.file_name]) # type: ignore
+        return keys, cached
+
+    def run_jobs(self, jobs: List[Job], workers: Optional[int] = None, force: bool = False, append: bool = False,
+            dry_run: bool = False) -> None:
+        # Runs all jobs on a pool of at most `max_workers` workers. The results of each file end up in
+        # `verification_times` in job order, regardless of the order in which the jobs finish.
+        # With `append` they are added to the earlier results of the file instead of replacing them.
+        # Repetitions that are already in the cache are not run again, unless `force` is set.
+        # With a planner the jobs start longest expected first; `dry_run` only prints the predicted schedule.
+        w = workers if workers != None else self.max_workers
+        w = max(1, min(w, self.max_workers)) # type: ignore
+        if dry_run:
+            planner = self.planner if self.planner != None else JobPlanner([], self.line_infos, self.timeout, self.metrics)
+            planner.print_plan(jobs, w) # type: ignore
+            return
+        keys, cached = self.cached_results(jobs, force)
+        # Before the earlier results of the files are replaced below
+        estimates = {job.file_name: self.memory_estimate(job.file_name) for job in jobs}
+        results: List[Optional[Tuple[float, Result]]] = [None] * len(jobs)
+        stats: List[Optional[RunStats]] = [None] * len(jobs)
+        todo: List[int] = []
+        for i, job in enumerate(jobs):
+            if not append or job.file_name not in self.verification_times:
+                self.verification_times[job.file_name] = []
+                self.run_stats[job.file_name] = []
+            if (job.file_name, job.repetition, job.config) in self.completed:
+                t, res, stats[i] = self.completed[(job.file_name, job.repetition, job.config)]
+                results[i] = (t, res)
+                print(job.file_name, results[i], "(resumed)")
+            elif job.repetition < len(cached.get(job.file_name, [])):
+                results[i] = cached[job.file_name][job.repetition]
+                # Also in the store, which is read back instead of the saved results when it exists
+                if self.store != None:
+                    self.store.append(job, *results[i], cached=True) # type: ignore
+                print(job.file_name, results[i], "(cached)")
+            else:
+                todo.append(i)
+
+        def finish(i: int, t: float, res: Result, stat: Optional[RunStats], progress: Optional[Progress] = None) -> None:
+            job = jobs[i]
+            results[i] = (t, res)
+            stats[i] = stat
+            if self.store != None:
+                self.store.append(job, t, res, stat) # type: ignore
+            if progress != None:
+                progress.finished(job, t, f"{job.file_name} {results[i]}") # type: ignore
+            else:
+                print(job.file_name, results[i])
+
+        env = self.job_environment()
+        job_timeout = self.job_timeout if self.job_timeout != None else self.timeout + 60
+
+        def run(i: int) -> None:
+            job = jobs[i]
+            estimate = estimates[job.file_name]
+            if self.memory != None:
+                self.memory.acquire(estimate) # type: ignore
+            try:
+                if self.isolation != None:
+                    finish(i, *self.run_isolated(job, env, job_timeout))
+                elif env != None and self.runner is runCommandStats:
+                    finish(i, *runCommandStats(job.command, job.log_file, False, job_timeout, env=env)) # type: ignore
+                else:
+                    finish(i, *self.runner(job.command, job.log_file, False, job_timeout)) # type: ignore
+            finally:
+                if self.memory != None:
+                    self.memory.release(estimate) # type: ignore
+
+        if self.planner != None:
+            todo.sort(key=lambda i: self.planner.estimate(jobs[i].file_name), reverse=True) # type: ignore
+        if self.spool != None and len(todo) > 0:
+            ids = self.spool.submit([jobs[i] for i in todo], env) # type: ignore
+            index = dict(zip(ids, todo))
+            self.spool.wait(ids, lambda job_id, t, res, stat: finish(index[job_id], t, res, stat)) # type: ignore
+        elif self.asynchronous and self.isolation == None and len(todo) > 0:
+            asyncio.run(self.run_async(jobs, todo, w, finish, estimates)) # type: ignore
+        else:
+            with ThreadPoolExecutor(max_workers=max(1, min(w, len(todo)))) as pool:
+                futures = [pool.submit(run, i) for i in todo]
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(e)
+
+        for job, verificationTime, stat in zip(jobs, results, stats):
+            if verificationTime != None:
+                file_stats = self.run_stats.setdefault(job.file_name, [])
+                # Keep the statistics aligned with the results, also after loading results without them
+                n = len(self.verification_times[job.file_name])
+                del file_stats[n:]
+                file_stats += [None] * (n - len(file_stats))
+                self.verification_times[job.file_name].append(verificationTime) # type: ignore
+                file_stats.append(stat)
+
+        if self.cache != None:
+            fresh: Dict[str, List[Tuple[float, Result]]] = defaultdict(list)
+            for i in todo:
+                if results[i] != None:
+                    fresh[jobs[i].file_name].append(results[i]) # type: ignore
+            for file_name in fresh:
+                if file_name in keys:
+                    self.cache.put(keys[file_name], file_name, cached[file_name] + fresh[file_name]) # type: ignore
+            self.cache.save() # type: ignore
+
+    async def run_async(self, jobs: List[Job], todo: List[int], workers: int,
+            finish: Callable[[int, float, Result, Optional[RunStats], Optional[Progress]], None], estimates: Dict[str, int]) -> None:
+        # Runs `jobs[i]` for every i in `todo`, at most `workers` at a time, and calls `finish` for each.
+        # `estimates` is the expected memory of each file, for `memory`.
+        # Interrupting the run cancels the running jobs; those that finished are already in the store.
+        limit = asyncio.Semaphore(workers)
+        job_timeout = self.job_timeout if self.job_timeout != None else self.timeout + 60
+        progress = Progress([jobs[i] for i in todo], workers, self.planner)
+
+        env = self.job_environment()
+
+        async def run(i: int) -> None:
+            async with limit:
+                job = jobs[i]
+                estimate = estimates[job.file_name]
+                if self.memory != None:
+                    while not self.memory.try_acquire(estimate): # type: ignore
+                        await asyncio.sleep(self.memory.poll) # type: ignore
+                try:
+                    t, res, stat = await runCommandAsync(job.command, job.log_file, False, job_timeout, env)
+                except OSError as e:
+                    print(e)
+                    t, res, stat = 0.0, Result.Error, None
+                finally:
+                    if self.memory != None:
+                        self.memory.release(estimate) # type: ignore
+                finish(i, t, res, stat, progress) # type: ignore
+
+        async def tick() -> None:
+            while True:
+                progress.show()
+                await asyncio.sleep(1)
+
+        ticker = asyncio.create_task(tick())
+        tasks = [asyncio.create_task(run(i)) for i in todo]
+        try:
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            # Let the running jobs kill their processes and write their logs
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            ticker.cancel()
+            progress.close()
+
+    def run_adaptive(self, file_name: str, min_repetitions: int = 3, max_repetitions: int = 10, rel_width: float = 0.05,
+            confidence: float = 0.95, extra_inconsistent: int = 4, timeout: Optional[int] = None, workers: Optional[int] = None) -> None:
+        # Repeats a file until the confidence interval of its mean time is at most `rel_width` times the mean,
+        # or `max_repetitions` is reached. Stable files stop after `min_repetitions`. When the outcomes are
+        # inconsistent (some runs pass, others do not), `extra_inconsistent` more runs are queued on top
+        # of the budget, as the notebook used to do by hand. Files that never pass or fail stop at the minimum.
+        w = workers if workers != None else self.max_workers
+        budget = max_repetitions
+        extended = False
+        self.verification_times[file_name] = []
+        self.run_stats[file_name] = []
+        while True:
+            xs = self.verification_times[file_name]
+            n = len(xs)
+            if is_inconsistent(xs) and not extended:
+                budget = max(budget, n + extra_inconsistent)
+                extended = True
+                print(f"inconsistent results for '{file_name}', queueing {extra_inconsistent} extra runs")
+            if n >= budget:
+                break
+            if n >= min_repetitions and not is_inconsistent(xs):
+                times = [t for (t,r) in xs if r == "pass" or r == "fail"]
+                if len(times) == 0:
+                    break
+                mean, half_width = confidence_interval(times, confidence)
+                if half_width <= rel_width * mean:
+                    break
+            # Run up to one repetition per worker, but at least up to the minimum
+            batch = max(min_repetitions - n, min(w, budget - n), 1) # type: ignore
+            before = n
+            self.run_jobs(self.jobs_for(file_name, batch, timeout, first=n), workers, append=True)
+            if len(self.verification_times[file_name]) == before:
+                print(f"No results for '{file_name}', stopping")
+                break
+        xs = self.verification_times[file_name]
+        print(f"'{file_name}': {len(xs)} repetitions")
+
+    def rerun_inconsistent(self, extra: int = 4, timeout: Optional[int] = None, workers: Optional[int] = None) -> List[str]:
+        # Runs every file with inconsistent results `extra` more times and returns these files
+        files = [f for f in self.verification_times if is_inconsistent(self.verification_times[f])]
+        jobs: List[Job] = []
+        for f in files:
+            jobs += self.jobs_for(f, extra, timeout, first=len(self.verification_times[f]))
+        self.run_jobs(jobs, workers, append=True)
+        return files
+
+    def run_pipeline(self, file_name: str, repetitions: Optional[int] = None, timeout: Optional[int] = None, useAPI = True,
+            workers: Optional[int] = None, force: bool = False) -> None:
+        # Two stage verification: VerCors translates and verifies the file once, end-to-end, and the Viper file it
+        # emits is cached under its content hash. The other repetitions only run Silicon on that cached file.
+        # The end-to-end time is stored under `file_name`, the backend-only times under `<file_name>-0.vpr`.
+        # If the file was translated before with the same command and VerCors version, the translation is
+        # skipped altogether and all repetitions are backend-only, unless `force` is set.
+        n: int = repetitions if repetitions != None else  self.repetitions # type: ignore
+        vpr_cache = ViperCache()
+        e2e = self.verification_jobs(file_name, 1, timeout, useAPI)
+        key = ResultCache.key(e2e[0].input_file, e2e[0].command, tool_version(self.vercors_loc))
+        vpr_path = None if force else vpr_cache.lookup(key)
+        backend_runs = n
+        if vpr_path == None:
+            # A Viper file from an earlier translation may still be there, only a file written by this run counts
+            vpr_file = "build/" + file_name + "-0.vpr"
+            before = os.stat(vpr_file).st_mtime_ns if os.path.exists(vpr_file) else None
+            self.run_jobs(e2e, workers, force)
+            backend_runs = n - 1
+            xs = self.verification_times.get(file_name, [])
+            res = xs[-1][1] if len(xs) > 0 else None
+            if res != Result.Pass and res != Result.Fail:
+                print(f"The end-to-end run of '{file_name}' ended with {res}, see logfile '{e2e[0].log_file}'")
+                return
+            if not os.path.exists(vpr_file) or os.stat(vpr_file).st_mtime_ns == before:
+                print(f"VerCors did not emit a new Viper file for '{file_name}', see logfile '{e2e[0].log_file}'")
+                return
+            vpr_path = vpr_cache.add(key, vpr_file)
         vpr_fn = file_name + "-0.vpr"
+        command = self.silicon_command(timeout, useAPI) + [vpr_path] # type: ignore
+        self.run_jobs([Job(vpr_fn, command, "logs/" + vpr_fn + ".txt", i) for i in range(backend_runs)], workers, force)
+
+    def pipeline_report(self, file_names: List[str]) -> str:
+        # End-to-end against backend-only times of files run with `run_pipeline`, the difference is
+        # roughly what the VerCors frontend (JVM startup, parsing and translation) costs per repetition
+        rows = [f"{'File':<40} {'End-to-end (s)':>15} {'Backend-only (s)':>17} {'Frontend (s)':>13}"]
+        for file_name in file_names:
+            e2e = get_average(self.verification_times.get(file_name, []))[0]
+            backend = get_average(self.verification_times.get(file_name + "-0.vpr", []))[0]
+            frontend = e2e - backend if e2e != None and backend != None else None # type: ignore
+            rows.append(f"{file_name:<40} " + " ".join(f"{'-' if v == None else round(v, 1):>{w}}" # type: ignore
+                        for v, w in ((e2e, 15), (backend, 17), (frontend, 13))))
+        return "\n".join(rows)
+
+    def rebuild_and_verify(self, names: List[str], repetitions: int = 1, build_dir: str = "build",
+            workers: Optional[int] = None) -> List[str]:
+        # Rebuilds only the given generators, and verifies only the outputs whose contents changed.
+        # Returns the changed outputs; results are printed as soon as each run finishes.
+        generators = cmake_generators()
+        changed: List[str] = []
+        for name in names:
+            source, outputs, targets = generators[name]
+            before = {o: file_hash(os.path.join(build_dir, o)) for o in outputs}
+            p = subprocess.run(["cmake", "--build", build_dir, "--target"] + targets, capture_output=True, text=True)
+            if p.returncode != 0:
+                print(f"Building '{name}' failed:\n{p.stdout}{p.stderr}")
+                continue
+            changed += [o for o in outputs if file_hash(os.path.join(build_dir, o)) != before[o]]
+        jobs: List[Job] = []
+        for o in changed:
+            jobs += self.jobs_for(o, repetitions)
+        if len(jobs) > 0:
+            self.run_jobs(jobs, workers)
+        return changed
+
+    def watch(self, interval: float = 1.0, repetitions: int = 1, build_dir: str = "build", workers: Optional[int] = None) -> None:
+        # Watches the sources of the generators in CMakeLists.txt; when one changes, it is rebuilt and the
+        # outputs that changed are verified again. Stop with Ctrl-C.
+        generators = cmake_generators()
+        mtimes = {name: os.path.getmtime(source) for name, (source, _, _) in generators.items() if os.path.exists(source)}
+        print(f"Watching {len(mtimes)} generators, press Ctrl-C to stop")
         try:
-            self.verification_times[vpr_fn] = []
-            for i in range(0,n):
-                verificationTime = runCommand(silicon_command + ["build/" + vpr_fn]
-                                                , log_file="logs/"+ vpr_fn + ".txt"
-                                              )
-                self.verification_times[vpr_fn].append(verificationTime)
-                print(vpr_fn, verificationTime)
-        except Exception as e:
-            print(e)
+            while True:
+                time.sleep(interval)
+                changed = []
+                for name in mtimes:
+                    mtime = os.path.getmtime(generators[name][0])
+                    if mtime != mtimes[name]:
+                        mtimes[name] = mtime
+                        changed.append(name)
+                if len(changed) > 0:
+                    print(f"Changed: {', '.join(generators[n][0] for n in changed)}")
+                    outputs = self.rebuild_and_verify(changed, repetitions, build_dir, workers)
+                    if len(outputs) == 0:
+                        print("No generated files changed")
+        except KeyboardInterrupt:
+            pass
+
+    def run_split(self, file_name: str, repetitions: Optional[int] = None, timeout: Optional[int] = None, useAPI = True,
+            workers: Optional[int] = None) -> None:
+        # Verifies a generated C file as independent units, one per function or loop nest (see
+        # `split_verification_units`), which run concurrently. Each unit's results are stored under
+        # `<file_name>:<unit>`, which shows which loop nest is the hotspot. The file itself gets the combined
+        # result, and as time the wall time from the start of the first unit until the end of the last.
+        n: int = repetitions if repetitions != None else  self.repetitions # type: ignore
+        units = split_verification_units("build/" + file_name, os.path.join("build", "split", file_name))
+        if list(units) == [""]:
+            print(f"'{file_name}' is verified as a single unit")
+            self.run_verification(file_name, n, timeout, useAPI, workers)
+            return
+        print(f"Splitting '{file_name}' into {len(units)} units: {', '.join(units)}")
+        self.verification_times[file_name] = []
+        self.run_stats[file_name] = []
+        for i in range(n):
+            jobs: List[Job] = []
+            for unit, path in units.items():
+                unit_name = os.path.relpath(path, "build")
+                command = self.verification_command(unit_name, timeout, useAPI)
+                jobs.append(Job(f"{file_name}:{unit}", command, "logs/" + file_name + ".txt", i))
+            start = time.monotonic()
+            self.run_jobs(jobs, workers, append=i > 0)
+            end = time.monotonic()
+            unit_results = [self.verification_times[job.file_name][-1][1] for job in jobs
+                            if len(self.verification_times.get(job.file_name, [])) > i]
+            if len(unit_results) < len(jobs):
+                unit_results.append(Result.Error)
+            verificationTime = (end - start, combine_results(unit_results))
+            self.verification_times[file_name].append(verificationTime)
+            self.run_stats[file_name].append(RunStats(end - start))
+            if self.store != None:
+                self.store.append(Job(file_name, self.verification_command(file_name, timeout, useAPI), None, i), # type: ignore
+                                  *verificationTime, self.run_stats[file_name][-1])
+            print(file_name, verificationTime)
+
+    def portfolio_configs(self, file_name: str, timeout: Optional[int] = None, seeds: int = 1) -> Dict[str, List[str]]:
+        # The default portfolio: the Z3 API and the Z3 process, the Z3 API with `seeds` randomised seed settings,
+        # and Silicon directly on the Viper file of an earlier run when it is newer than the source file, so it
+        # is a translation of this version of the file. The VerCors runs each write their own Viper file, so they
+        # do not overwrite the one Silicon reads.
+        configs: Dict[str, List[str]] = {
+            "z3-api": self.verification_command(file_name, timeout, True, file_base=file_name + ".z3-api"),
+            "z3-process": self.verification_command(file_name, timeout, False, file_base=file_name + ".z3-process"),
+        }
+        for i in range(seeds):
+            configs[f"z3-api-seed-{i}"] = self.verification_command(file_name, timeout, True, ["--z3RandomizeSeeds"],
+                                                                    file_base=file_name + f".z3-api-seed-{i}")
+        vpr_file = "build/" + file_name + "-0.vpr"
+        if os.path.exists(vpr_file) and os.path.getmtime(vpr_file) > os.path.getmtime("build/" + file_name):
+            configs["silicon"] = self.silicon_jobs(file_name, 1, timeout)[0].command
+        return configs
+
+    def run_portfolio(self, file_name: str, configs: Optional[Dict[str, List[str]]] = None, repetitions: Optional[int] = None,
+            timeout: Optional[int] = None) -> None:
+        # Races several configurations (name -> command) of the same file. The first conclusive result (pass or
+        # fail) is taken and the other runs are killed; if no run is conclusive, the first timeout counts, or
+        # else the first error. The winning configuration of each repetition is kept in `portfolio_winners`.
+        # All configurations start at the same time, regardless of `max_workers`.
+        n: int = repetitions if repetitions != None else  self.repetitions # type: ignore
+        t = timeout if timeout != None else self.timeout
+        portfolio: Dict[str, List[str]] = configs if configs != None else self.portfolio_configs(file_name, t) # type: ignore
+        self.verification_times[file_name] = []
+        self.run_stats[file_name] = []
+        self.portfolio_winners[file_name] = []
+        for i in range(n):
+            cancel = threading.Event()
+            lock = threading.Lock()
+            outcomes: List[Tuple[str, Tuple[float, Result, RunStats]]] = []
+            def race(name: str) -> None:
+                # The harness timeout is a safety net, VerCors and Silicon enforce `t` themselves
+                outcome = runCommandStats(portfolio[name], "logs/" + file_name + ".txt", False, t + DAEMON_GRACE, cancel)
+                with lock:
+                    outcomes.append((name, outcome))
+                    if outcome[1] == Result.Pass or outcome[1] == Result.Fail:
+                        cancel.set()
+            with ThreadPoolExecutor(max_workers=len(portfolio)) as pool:
+                for future in [pool.submit(race, name) for name in portfolio]:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(e)
+            winner: Optional[Tuple[str, Tuple[float, Result, RunStats]]] = None
+            for kinds in ((Result.Pass, Result.Fail), (Result.TimeOut,), (Result.Error,)):
+                winner = next((o for o in outcomes if o[1][1] in kinds), None)
+                if winner != None:
+                    break
+            if winner == None:
+                continue
+            name, (time_taken, res, stats) = winner # type: ignore
+            self.verification_times[file_name].append((time_taken, res))
+            self.run_stats[file_name].append(stats)
+            self.portfolio_winners[file_name].append(name)
+            if self.store != None:
+                self.store.append(Job(file_name, portfolio[name], None, i), time_taken, res, stats) # type: ignore
+            print(file_name, (time_taken, res), f"(won by {name})")
+
+    def portfolio_summary(self) -> Counter[str]:
+        # How often each configuration won, to choose the default configuration
+        return Counter(w for ws in self.portfolio_winners.values() for w in ws if w != None)
 
-    def front_end(self, name: str, repetitions: Optional[int] = None, timeout: Optional[int] = None) -> None:
+    def use_daemons(self, server_command: List[str], size: Optional[int] = None) -> None:
+        # Run all VerCors verifications on a pool of verifier daemons started with `server_command`, one per
+        # worker by default. Only a server that keeps VerCors warm saves time; the `daemon` command of this
+        # file starts a fresh process per job and is only meant to test the protocol.
+        self.stop_daemons()
+        self.daemons = DaemonPool(server_command, self.vercors_loc, size if size != None else self.max_workers) # type: ignore
+        self.runner = self.daemons.run_stats
+
+    def stop_daemons(self) -> None:
+        if self.daemons != None:
+            self.daemons.close() # type: ignore
+            self.daemons = None
+        self.runner = runCommandStats
+
+    def run_verification(self, file_name: str, repetitions: Optional[int] = None, timeout: Optional[int] = None, useAPI= False,
+            workers: Optional[int] = None, force: bool = False)-> None:
+        self.run_jobs(self.verification_jobs(file_name, repetitions, timeout, useAPI), workers, force)
+
+    def run_silicon(self, file_name: str, repetitions: Optional[int] = None, timeout: Optional[int] = None,
+            workers: Optional[int] = None, force: bool = False)-> None:
+        self.run_jobs(self.silicon_jobs(file_name, repetitions, timeout), workers, force)
+
+    def front_end(self, name: str, repetitions: Optional[int] = None, timeout: Optional[int] = None,
+            workers: Optional[int] = None, force: bool = False) -> None:
         pvl_name = self.version_to_file_name(name, 'front')
-        self.run_verification(pvl_name, repetitions, timeout)
+        self.run_verification(pvl_name, repetitions, timeout, workers=workers, force=force)
 
-    def back_end(self, name: str, mem: bool = False, repetitions: Optional[int] = None, timeout: Optional[int] = None, version: str ='all') -> None:
+    def back_end_jobs(self, name: str, mem: bool = False, repetitions: Optional[int] = None, timeout: Optional[int] = None, version: str ='all') -> List[Job]:
         if mem:
             testing = self.mem_versions[name] if version == 'all' else [version]
         else:
             testing = self.versions[name] if version == 'all' else [version]
+        jobs: List[Job] = []
         for v in testing:
             filename = self.version_to_file_name(name, v, mem)
-            self.run_verification(filename, repetitions, timeout, useAPI=True)
+            jobs += self.verification_jobs(filename, repetitions, timeout, useAPI=True)
+        return jobs
+
+    def back_end(self, name: str, mem: bool = False, repetitions: Optional[int] = None, timeout: Optional[int] = None, version: str ='all',
+            workers: Optional[int] = None, force: bool = False) -> None:
+        self.run_jobs(self.back_end_jobs(name, mem, repetitions, timeout, version), workers, force)
+
+    def matrix_jobs(self, names: Optional[List[str]] = None, front: bool = True, back: bool = True, mem: bool = True,
+            repetitions: Optional[int] = None, timeout: Optional[int] = None) -> List[Job]:
+        # All jobs of the experiments, in the same order the notebook runs them:
+        # per benchmark the front end, the back end and then the memory versions.
+        if names == None:
+            names = list(self.versions) + [n for n in self.mem_versions if n not in self.versions]
+        jobs: List[Job] = []
+        for name in names: # type: ignore
+            if front and name in self.versions:
+                jobs += self.verification_jobs(self.version_to_file_name(name, 'front'), repetitions, timeout)
+            if back and name in self.versions:
+                jobs += self.back_end_jobs(name, False, repetitions, timeout)
+            if mem and name in self.mem_versions:
+                jobs += self.back_end_jobs(name, True, repetitions, timeout)
+        return jobs
+
+    def run_matrix(self, names: Optional[List[str]] = None, front: bool = True, back: bool = True, mem: bool = True,
+            repetitions: Optional[int] = None, timeout: Optional[int] = None, workers: Optional[int] = None, force: bool = False,
+            dry_run: bool = False) -> None:
+        self.run_jobs(self.matrix_jobs(names, front, back, mem, repetitions, timeout), workers, force, dry_run=dry_run)
 
     def save_results(self, prefix: str) -> None:
         pre = f'{prefix}'
         with open(pre + '_results_verification.json', 'w') as f:
-            f.write(json.dumps(self.verification_times))
+            f.write(results_to_json(self.verification_times, self.run_stats))
         with open(pre + '_line_info.json', 'w') as f:
             f.write(json.dumps(self.line_infos, cls=Encoder))
 
     def load_results(self, prefix: str) -> None:
+        # The append-only store of a run is preferred when there is one, since it also holds the runs
+        # that finished after the last `save_results`
+        if os.path.exists(prefix + "_runs.jsonl"):
+            self.verification_times, self.run_stats = ResultStore(prefix + "_runs.jsonl").results()
+            if os.path.exists(prefix + "_line_info.json"):
+                with open(prefix + "_line_info.json") as f:
+                    self.line_infos = json.loads(f.read(), object_hook=as_line_info)
+            return
         results_verification, line_info = read_results(prefix)
         self.verification_times = results_verification
+        self.run_stats = read_run_stats(prefix)
         self.line_infos = line_info
 
+    def phase_breakdown(self, file_name: str) -> Dict[str, float]:
+        # Average seconds per phase over the runs of a file that were split into phases
+        phases: Dict[str, List[float]] = defaultdict(list)
+        for stats in self.run_stats.get(file_name, []):
+            if stats != None and stats.phases != None:
+                for phase, t in stats.phases.items(): # type: ignore
+                    phases[phase].append(t)
+        return {phase: statistics.fmean(ts) for phase, ts in phases.items()}
+
     def make_table(self, directivesUsed: Dict[str, Dict[str,str]], halideLoC: Dict[str, int], 
-            halideAnn: Dict[str, int], scheduleLoC: Dict[str, Dict[str,int]]
-            ) -> str:
-        header0 = r"\begin{tabular}{l l \vbar \vbar r r \vbar r \vbar r \vbar r r r r \vbar \vbar r}"
-        header1 = r"\hline Name & & \multicolumn{2}{l\vbar}{\halide} & \multicolumn{1}{l\vbar}{Fr-end} & Sched. & \multicolumn{3}{l}{\C} & & LoA \\"
-        header2 = r"& & LoC & LoA & T. (s) & LoC & LoC & LoA & Loops & T. (s) & incr. \\ \hline \hline"
+            halideAnn: Dict[str, int], scheduleLoC: Dict[str, Dict[str,int]], resource_columns: Optional[List[str]] = None,
+            statistic: str = "mean") -> str:
+        # `resource_columns` are extra columns from RESOURCE_COLUMNS, added after the last column.
+        # `statistic` is what the time columns show, one of STATISTICS.
+        columns: List[str] = resource_columns if resource_columns != None else [] # type: ignore
+        # Computed once for all cells, "mean" does not use them
+        stats = compute_statistics(self.verification_times) if statistic != "mean" else {}
+        header0 = r"\begin{tabular}{l l \vbar \vbar r r \vbar r \vbar r \vbar r r r r \vbar \vbar r" + " r" * len(columns) + "}"
+        header1 = r"\hline Name & & \multicolumn{2}{l\vbar}{\halide} & \multicolumn{1}{l\vbar}{Fr-end} & Sched. & \multicolumn{3}{l}{\C} & & LoA" + " &" * len(columns) + r" \\"
+        header2 = r"& & LoC & LoA & T. (s) & LoC & LoC & LoA & Loops & T. (s) & incr. " + resource_headers(columns) + r"\\ \hline \hline"
 
         rows: List[str] = [header0, header1, header2]
         for name in self.versions:
@@ -312,7 +2736,8 @@ class Experiments:
                     if name == 'auto_viz':
                         shortname = 'auto\_'
                     front_filename = self.version_to_file_name(name, 'front')
-                    t = average_to_str(self.verification_times[front_filename], front_filename)
+                    t = statistic_to_str(self.verification_times[front_filename], front_filename, statistic,
+                                         stats.get(front_filename))
                     row += f"{shortname} & V{v} & {halideLoC[name]} & {halideAnn[name]} & {t} & 0 & "
                 else:
                     if name == 'conv_layer' and v == self.versions[name][1]:
@@ -329,18 +2754,21 @@ class Experiments:
                 row += f"{self.line_infos[filename].loops} & "
                 
                 res = self.verification_times[filename]
-                t = average_to_str(self.verification_times[filename], filename)
+                t = statistic_to_str(self.verification_times[filename], filename, statistic, stats.get(filename))
                 row += f"{t} & "
-                row += str(round(self.line_infos[filename].nr_annotations / halideAnn[name], 1)) + "x" + r"\\ \hline"
+                row += str(round(self.line_infos[filename].nr_annotations / halideAnn[name], 1)) + "x"
+                for c in columns:
+                    row += " & " + resources_to_str(self.run_stats.get(filename, []), c)
+                row += r"\\ \hline"
                 rows.append(row)
             rows.append ("\hline")
         rows.append(r"\end{tabular}")
         return "\n".join(rows)
 
     def save_table(self, directivesUsed: Dict[str, Dict[str,str]], halideLoC: Dict[str, int], 
-            halideAnn: Dict[str, int], scheduleLoC: Dict[str, Dict[str,int]]
-            ) -> None:
-        table = self.make_table(directivesUsed, halideLoC, halideAnn, scheduleLoC)
+            halideAnn: Dict[str, int], scheduleLoC: Dict[str, Dict[str,int]], resource_columns: Optional[List[str]] = None,
+            statistic: str = "mean") -> None:
+        table = self.make_table(directivesUsed, halideLoC, halideAnn, scheduleLoC, resource_columns, statistic)
 
         with open('result_table.tex', 'w') as f:
             f.write(table)
@@ -394,25 +2822,42 @@ def is_schedule(line: str)-> Optional[int]:
         return None
     
 def count_cpp_file(f: str)-> Tuple[int, int, Dict[int, Counter[str]]]:
+    with open(f) as file:
+        return scan_cpp(file.read())
+
+# `count_schedule_directives` and `count_annotations` in one pass over a line
+CPP_MATCHER = re.compile(r"\.(?P<directive>parallel|vectorize|unroll|split|tile|fuse|reorder|compute_root|compute_at|store_at|store_root|"
+                         r"fold_storage|compute_with|prefetch|bound_extent|bound|rename|update)\(|(?P<annotation>ensures|context|requires|invariant)\(")
+
+def scan_cpp(text: str)-> Tuple[int, int, Dict[int, Counter[str]]]:
+    # The same counts as `count_cpp_file`, for the contents of a file
     anns = 0
-    sched = 0
     sched_dict = {-1: Counter(), 0: Counter(), 1: Counter(), 2: Counter(), 3: Counter(), 4: Counter()}
     loc = 0
-    with open(f) as f:
-        current_sched = -1
-        for l in f:
-            l = l.strip().split("//")[0]
-
-            next_sched = is_schedule(l)
-            if(next_sched != None):
-                current_sched = next_sched
-            else:
-                i = count_annotations(l)
-                anns += i
-                sched_dict[current_sched] += count_schedule_directives(l)
-                # Do not count lines which are part of the schedule or the annotations
-                if(current_sched == -1 and i == 0):
-                    loc += 1
+    current_sched = -1
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    for l in lines:
+        l = l.strip().split("//")[0]
+
+        next_sched = is_schedule(l)
+        if(next_sched != None):
+            current_sched = next_sched
+        else:
+            i = 0
+            # A directive counts once per line
+            directives = set()
+            for m in CPP_MATCHER.finditer(l):
+                if m.lastgroup == "annotation":
+                    i += 1
+                else:
+                    directives.add(m.group("directive"))
+            anns += i
+            sched_dict[current_sched].update(directives)
+            # Do not count lines which are part of the schedule or the annotations
+            if(current_sched == -1 and i == 0):
+                loc += 1
     return anns, loc, sched_dict
 
 def get_directives(sched: Counter[str])-> str:
@@ -434,15 +2879,16 @@ def get_directives(sched: Counter[str])-> str:
     
     return '\{' + ','.join(result) + '\}'
 
-def make_normal_table(experiments: Experiments)->str:
+def make_normal_table(experiments: Experiments, resource_columns: Optional[List[str]] = None, statistic: str = "mean")->str:
     directivesUsed : Dict[str, Dict[str,str]] = {}
     scheduleLoC: Dict[str, Dict[str,int]] =  {}
     halideAnn: Dict[str, int] = {}
     halideLoC: Dict[str, int]  = {}
 
+    cpp_files = experiments.metrics.cpp_files(["src/" + name + ".cpp" for name in experiments.versions])
     for name in experiments.versions:
         fn = "src/" + name + ".cpp" 
-        anns, loc, sched_dict = count_cpp_file(fn)
+        anns, loc, sched_dict = cpp_files[fn]
         halideAnn[name] = anns
         halideLoC[name] = loc
         # 'bound' can also occur outside the schedule, which is fine
@@ -454,16 +2900,20 @@ def make_normal_table(experiments: Experiments)->str:
             directivesUsed[name][v] = get_directives(sched_dict[int(v)])
             scheduleLoC[name][v] = sum(sched_dict[int(v)].values())
 
-    return experiments.make_table(directivesUsed, halideLoC, halideAnn, scheduleLoC)
+    return experiments.make_table(directivesUsed, halideLoC, halideAnn, scheduleLoC, resource_columns, statistic)
 
-def make_mem_table(experiments: Experiments)->str:
+def make_mem_table(experiments: Experiments, resource_columns: Optional[List[str]] = None, statistic: str = "mean")->str:
+    columns: List[str] = resource_columns if resource_columns != None else [] # type: ignore
+    # Computed once for all cells, "mean" does not use them
+    stats = compute_statistics(experiments.verification_times) if statistic != "mean" else {}
     directivesUsedMem : Dict[str, Dict[str,str]] = {}
     scheduleLoCMem: Dict[str, Dict[str,int]] = {}
     halideLoCMem: Dict[str, int]  = {}
 
+    cpp_files = experiments.metrics.cpp_files(["src/" + name + ".cpp" for name in experiments.mem_versions])
     for name in experiments.mem_versions:
         fn = "src/" + name + ".cpp" 
-        anns, loc, sched_dict = count_cpp_file(fn)
+        anns, loc, sched_dict = cpp_files[fn]
         halideLoCMem[name] = loc
         
         # 'bound' can also occur outside the schedule, which is fine
@@ -476,9 +2926,9 @@ def make_mem_table(experiments: Experiments)->str:
             directivesUsedMem[name][v] = get_directives(sched_dict[version])
             scheduleLoCMem[name][v] = sum(sched_dict[version].values())
 
-    header0 = r"\begin{tabular}{l l \vbar \vbar r \vbar r \vbar r r r r}"
-    header1 = r"\hline \textbf{Name} & & \multicolumn{1}{l\vbar}{\textbf{\halide}} & \textbf{\textbf{Sched}}. & \multicolumn{3}{l}{\textbf{\c}} & \\"
-    header2 = r"& & \textbf{LoC} & \textbf{Dir.} & \textbf{LoC} & \textbf{Ann.} & \textbf{Loops} & \textbf{T. (s).} \\ \hline \hline"
+    header0 = r"\begin{tabular}{l l \vbar \vbar r \vbar r \vbar r r r r" + " r" * len(columns) + "}"
+    header1 = r"\hline \textbf{Name} & & \multicolumn{1}{l\vbar}{\textbf{\halide}} & \textbf{\textbf{Sched}}. & \multicolumn{3}{l}{\textbf{\c}} & " + "& " * len(columns) + r"\\"
+    header2 = r"& & \textbf{LoC} & \textbf{Dir.} & \textbf{LoC} & \textbf{Ann.} & \textbf{Loops} & \textbf{T. (s).} " + resource_headers(columns, bold=True) + r"\\ \hline \hline"
 
     rows: List[str] = [header0, header1, header2]
     for name in experiments.mem_versions:
@@ -514,10 +2964,96 @@ def make_mem_table(experiments: Experiments)->str:
             row += f"{experiments.line_infos[filename].loops} & "
 
             res = experiments.verification_times[filename]
-            row += average_to_str(res, filename)
+            row += statistic_to_str(res, filename, statistic, stats.get(filename))
+            for c in columns:
+                row += " & " + resources_to_str(experiments.run_stats.get(filename, []), c)
             row += r"\\ \hline"
             rows.append(row)
         rows.append ("\hline")
     rows.append(r"\end{tabular}")
     mem_table = "\n".join(rows)
-    return mem_table
\ No newline at end of file
+    return mem_table
+
+def run_config(path: str, dry_run: bool = False) -> None:
+    # Runs the experiments like RunExperiments.ipynb does, but without Jupyter, e.g. on batch nodes. The
+    # config is a JSON object, see experiments.json. Only `versions` is required, the other keys are:
+    #   vercors, silicon: locations of the tools
+    #   repetitions, timeout, workers: as in `Experiments`, `job_timeout` as in `Experiments.job_timeout`
+    #   benchmarks: the benchmarks to run, by default all; front, back, mem: which parts of the matrix to run
+    #   results: directory where the results are saved, under the current date and time
+    #   resume: prefix of an earlier run to continue, instead of starting a new one
+    #   history: directory with earlier results, to plan the jobs and estimate the remaining time
+    #   memory: arguments of `Experiments.use_memory_limits`, e.g. {"reserve_mb": 2048, "jvm_heap_mb": 8192}
+    #   isolation: arguments of `Experiments.use_isolation`, for timing runs, e.g. {"cores_per_job": 2}
+    #   rerun_inconsistent: number of extra runs for files with inconsistent results
+    #   tables: print the tables of the paper, which needs results for all versions
+    #   statistic: the time shown in the tables, one of STATISTICS
+    #   progress: let VerCors print its progress, to split the runs into phases
+    with open(path) as f:
+        config: Dict[str, Any] = json.load(f)
+    experiments = Experiments(config["versions"], config.get("mem_versions", {}), config.get("vercors", "/vercors/vct"),
+                              config.get("silicon", "/vercors/silicon"), config.get("repetitions", 5),
+                              config.get("timeout", 10*60), config.get("workers", 1))
+    experiments.asynchronous = True
+    experiments.job_timeout = config.get("job_timeout")
+    experiments.progress = config.get("progress", False)
+    if config.get("memory") != None:
+        experiments.use_memory_limits(**config["memory"])
+    if config.get("isolation") != None:
+        experiments.use_isolation(**config["isolation"])
+    experiments.count_files()
+    if config.get("history") != None:
+        experiments.use_history(config["history"])
+    if config.get("resume") != None:
+        prefix = config["resume"]
+    else:
+        prefix = os.path.join(config.get("results", "results"), datetime.datetime.now().strftime('%Y-%m-%d-%H-%M-%S'))
+    if not dry_run:
+        experiments.open_store(prefix, resume=config.get("resume") != None)
+    experiments.run_matrix(config.get("benchmarks"), config.get("front", True), config.get("back", True),
+                           config.get("mem", True), dry_run=dry_run)
+    if dry_run:
+        return
+    if config.get("rerun_inconsistent", 0) > 0:
+        experiments.rerun_inconsistent(config["rerun_inconsistent"])
+    experiments.save_results(prefix)
+    print(f"Results saved under '{prefix}'")
+    if config.get("tables", False):
+        print(make_normal_table(experiments, statistic=config.get("statistic", "mean")))
+        print(make_mem_table(experiments, statistic=config.get("statistic", "mean")))
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the HaliVer experiments")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    daemon_parser = subparsers.add_parser("daemon", help="serve verification jobs over stdin/stdout, one fresh process per job, to test VerifierDaemon")
+    daemon_parser.add_argument("verifier", nargs="+", help="verifier command to run the jobs with")
+    worker_parser = subparsers.add_parser("worker", help="run verification jobs from a spool directory, see WorkQueue")
+    worker_parser.add_argument("spool", nargs="?", default="spool", help="spool directory shared with the experiments")
+    worker_parser.add_argument("--name", help="name of the worker, by default the host name and process id")
+    worker_parser.add_argument("--heartbeat", type=float, default=10, help="seconds between heartbeats")
+    worker_parser.add_argument("--idle-exit", type=float, help="stop after this many seconds without jobs")
+    run_parser = subparsers.add_parser("run", help="run the experiments described by a config file, see run_config")
+    run_parser.add_argument("--config", default="experiments.json", help="JSON config file")
+    run_parser.add_argument("--dry-run", action="store_true", help="only print the predicted schedule")
+    compare_parser = subparsers.add_parser("compare", help="compare runs with a baseline, exits with 1 on regressions")
+    compare_parser.add_argument("prefixes", nargs="+", help="result prefixes, the first one is the baseline")
+    compare_parser.add_argument("--format", choices=["text", "markdown", "latex"], default="text")
+    compare_parser.add_argument("--alpha", type=float, default=0.05, help="significance level")
+    compare_parser.add_argument("--min-change", type=float, default=0.05, help="smallest relative change in time that counts")
+    compare_parser.add_argument("--all", action="store_true", help="also list files that did not change")
+    args = parser.parse_args()
+    if args.command == "daemon":
+        serve_daemon(args.verifier)
+    elif args.command == "worker":
+        run_worker(args.spool, args.name, args.heartbeat, args.idle_exit)
+    elif args.command == "compare":
+        if len(args.prefixes) < 2:
+            parser.error("compare needs a baseline and at least one other run")
+        sys.exit(1 if compare_runs(args.prefixes, args.format, args.alpha, args.min_change, args.all) else 0)
+    elif args.command == "run":
+        try:
+            run_config(args.config, args.dry_run)
+        except KeyboardInterrupt:
+            print("Interrupted, the runs that finished are in the result store")
+            sys.exit(130)
@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import preprocess
+from preprocess import Experiments, Result
+
+class DaemonTimeoutTest(unittest.TestCase):
+    # A daemon that reads its requests but never answers must time out and be restarted,
+    # also when `Experiments` runs the jobs
+    def test_hanging_daemon_times_out(self):
+        directory = tempfile.mkdtemp()
+        cwd = os.getcwd()
+        os.chdir(directory)
+        grace = preprocess.DAEMON_GRACE
+        preprocess.DAEMON_GRACE = 1
+        try:
+            os.makedirs("build")
+            os.makedirs("logs")
+            with open("build/hang.c", "w") as f:
+                f.write("int main() { return 0; }\n")
+            e = Experiments({}, {}, "vct", "silicon", repetitions=1, timeout=1)
+            e.job_timeout = 1
+            e.use_daemons([sys.executable, "-c", "import sys, time\nfor line in sys.stdin: time.sleep(100)"], 1)
+            start = time.monotonic()
+            e.run_verification("hang.c")
+            e.stop_daemons()
+            self.assertLess(time.monotonic() - start, 10)
+            self.assertEqual(e.verification_times["hang.c"][0][1], Result.TimeOut)
+        finally:
+            preprocess.DAEMON_GRACE = grace
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    unittest.main()